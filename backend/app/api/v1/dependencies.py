@@ -0,0 +1,49 @@
+from fastapi import Depends, HTTPException, status
+from fastapi.security import OAuth2PasswordBearer
+from app.db.session import DBSession, get_db
+from app.services.user_service import Principal, resolve_principal, resolve_token_version
+from app.utils.jwt import verify_token
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
+
+# Tokens issued before the `ver` claim existed belong to token version 0, the column's default
+LEGACY_TOKEN_VERSION = 0
+
+def _credentials_error(detail: str) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: DBSession = Depends(get_db)) -> Principal:
+    """
+    Resolve the authenticated principal for a request
+
+    Tokens carrying uid/is_active/ver claims are trusted without a user lookup; only the
+    user's token version is checked, from the token version cache. Older tokens with just
+    `sub` fall back to the (cached) principal lookup and count as version 0, so /revoke
+    revokes them too.
+    """
+    token_data = verify_token(token)
+    if token_data is None:
+        raise _credentials_error("Could not validate credentials")
+
+    if token_data.uid is not None and token_data.token_version is not None:
+        if token_data.is_active is False:
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+        current_version = await resolve_token_version(db, token_data.uid)
+        if current_version is None:
+            raise _credentials_error("User not found")
+        if current_version != token_data.token_version:
+            raise _credentials_error("Token has been revoked")
+        return Principal(id=token_data.uid, username=token_data.username, is_active=True)
+
+    user = await resolve_principal(db, token_data.username)
+    if user is None:
+        raise _credentials_error("User not found")
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    if await resolve_token_version(db, user.id) != LEGACY_TOKEN_VERSION:
+        raise _credentials_error("Token has been revoked")
+    return user
@@ -1,61 +1,63 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
-from app.db.session import SessionLocal
+from app.db.session import DBSession, get_db, run_db
 from app.schemas.user import UserCreate, UserResponse, Token
-from app.services.user_service import create_user, authenticate_user, get_user_by_username, get_user_by_email
-from app.utils.jwt import create_access_token
+from app.services.user_service import Principal, create_user, authenticate_user, get_user_by_username, get_user_by_email, revoke_user_tokens
+from app.utils.jwt import create_user_access_token
+from app.api.v1.dependencies import get_current_user
 from app.core.config import settings
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/token")
-
 @router.post("/token", response_model=Token)
-async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends(), db: DBSession = Depends(get_db)):
     """
     Authenticate user and return JWT token
     """
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if user.is_active is False:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user"
+        )
     
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
-    )
+    access_token = create_user_access_token(user, expires_delta=access_token_expires)
     
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/revoke")
+async def revoke_tokens(current_user: Principal = Depends(get_current_user), db: DBSession = Depends(get_db)):
+    """
+    Revoke every access token issued to the current user, including the one used for this request
+    """
+    await run_db(db, revoke_user_tokens, user_id=current_user.id)
+    return {"message": "All access tokens have been revoked"}
+
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+async def register_user(user: UserCreate, db: DBSession = Depends(get_db)):
     """
     Register a new user
     """
-    db_user = get_user_by_username(db, username=user.username)
+    db_user = await run_db(db, get_user_by_username, username=user.username)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already registered"
         )
     
-    db_user = get_user_by_email(db, email=user.email)
+    db_user = await run_db(db, get_user_by_email, email=user.email)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    return create_user(db=db, user=user)
+    return await create_user(db, user)
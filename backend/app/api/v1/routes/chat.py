@@ -1,62 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
-from app.db.session import SessionLocal
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from typing import List, Optional
+from app.db.session import DBSession, get_db, run_db
 from app.schemas.chat import ChatMessageCreate, ChatResponse, ChatHistory, ChatHistoryItem, ChatMessageUpdate
-from app.services.chat_service import process_user_message, get_chat_messages_by_user_id, get_chat_message_by_id, update_chat_message
+from app.services.chat_service import process_user_message, stream_user_message, get_chat_messages_by_user_id, get_chat_message_by_id, update_chat_message
+from app.services.chat_memory_service import update_chat_summary
 from app.services.profile_service import get_profile_by_user_id
 from app.services.plan_service import create_plan_from_message
-from app.api.v1.routes.auth import oauth2_scheme
-from app.utils.jwt import verify_token
+from app.api.v1.dependencies import get_current_user
+from app.utils.json_encoder import DateTimeEncoder
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+import json
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    token_data = verify_token(token)
-    if token_data is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    from app.services.user_service import get_user_by_username
-    user = get_user_by_username(db, username=token_data.username)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    return user
-
 @router.post("/send", response_model=ChatResponse)
-async def send_message(message: ChatMessageCreate, current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+async def send_message(
+    message: ChatMessageCreate,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
     """
     Send a message to the AI coach and get a response
     """
-    user_profile = get_profile_by_user_id(db, user_id=current_user.id)
+    user_profile = await run_db(db, get_profile_by_user_id, user_id=current_user.id)
+    
+    response = await process_user_message(db, message.content, current_user.id, user_profile=user_profile)
     
-    response = process_user_message(db, message.content, current_user.id, user_profile=user_profile)
+    background_tasks.add_task(update_chat_summary, current_user.id)
     
     return response
 
+@router.post("/send/stream")
+async def send_message_stream(
+    message: ChatMessageCreate,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
+    """
+    Send a message to the AI coach and stream the response as server-sent events
+    """
+    user_profile = await run_db(db, get_profile_by_user_id, user_id=current_user.id)
+    
+    events = await stream_user_message(db, message.content, current_user.id, user_profile=user_profile)
+    
+    async def event_stream():
+        async for event in events:
+            yield f"event: {event['event']}\ndata: {json.dumps(event['data'], cls=DateTimeEncoder)}\n\n"
+    
+    # Runs once the stream has finished, so the assistant reply is already saved
+    background_tasks.add_task(update_chat_summary, current_user.id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/history", response_model=ChatHistory)
-async def get_chat_history(current_user = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_chat_history(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
     """
-    Get chat history for the current user
+    Get chat history for the current user, newest first
+    Pass the returned next_cursor back as `cursor` to fetch older messages
     """
-    chat_messages = get_chat_messages_by_user_id(db, user_id=current_user.id)
+    try:
+        chat_messages, next_cursor = await run_db(db, get_chat_messages_by_user_id, user_id=current_user.id, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
     return {
-        "messages": chat_messages
+        "messages": chat_messages,
+        "next_cursor": next_cursor
     }
 
 @router.put("/message/{message_id}/mark-plan", status_code=status.HTTP_200_OK)
@@ -64,12 +85,12 @@ async def mark_message_as_plan(
     message_id: str,
     message_update: ChatMessageUpdate,
     current_user = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
     Mark a chat message as a plan and create a plan from it
     """
-    message = get_chat_message_by_id(db, message_id)
+    message = await run_db(db, get_chat_message_by_id, message_id)
     
     if not message:
         raise HTTPException(
@@ -83,10 +104,10 @@ async def mark_message_as_plan(
             detail="Not authorized to update this message"
         )
     
-    updated_message = update_chat_message(db, message_id, message_update)
+    updated_message = await run_db(db, update_chat_message, message_id, message_update)
     
     if message_update.is_plan and message_update.plan_type:
-        plan = create_plan_from_message(db, message, current_user.id, message_update.plan_type)
+        plan = await run_db(db, create_plan_from_message, message, current_user.id, message_update.plan_type)
         return {"message": "Message marked as plan and plan created", "plan_id": plan.id}
     
     return {"message": "Message updated successfully"}
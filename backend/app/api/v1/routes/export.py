@@ -0,0 +1,31 @@
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportError, get_export_encoder, stream_user_data
+from app.api.v1.dependencies import get_current_user
+from app.models.user import User
+
+router = APIRouter()
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: str,
+    export_format: str = Query("ndjson", alias="format", description="ndjson, csv or parquet"),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download all of the current user's progress, chat or plans data, oldest first
+    The file is streamed from a server-side cursor in batches, so any history size downloads with flat memory
+    Parquet needs the optional pyarrow package on the server
+    """
+    try:
+        encoder = get_export_encoder(dataset, export_format)
+    except ExportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    filename = f"{dataset}-{datetime.utcnow():%Y%m%d}.{export_format}"
+    return StreamingResponse(
+        stream_user_data(encoder, current_user.id, dataset),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.core.config import settings
+from app.schemas.job import JobResponse
+from app.services.job_service import Job, get_job_queue, serialize_job
+from app.api.v1.dependencies import get_current_user
+from app.models.user import User
+
+router = APIRouter()
+
+def get_user_job(job_id: str, current_user: User) -> Job:
+    job = get_job_queue().get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    if job.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized to access this job")
+    
+    return job
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, current_user: User = Depends(get_current_user)):
+    """
+    Get the current status of a background job
+    """
+    return serialize_job(get_user_job(job_id, current_user))
+
+@router.get("/{job_id}/wait", response_model=JobResponse)
+async def wait_for_job(
+    job_id: str,
+    timeout: float = Query(30, ge=0, le=settings.JOB_WAIT_MAX_TIMEOUT),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Wait up to `timeout` seconds for a background job to finish and return its status
+    """
+    job = get_user_job(job_id, current_user)
+    
+    job = await get_job_queue().wait(job, timeout=timeout)
+    
+    return serialize_job(job)
@@ -1,55 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
-from app.db.session import SessionLocal
+from app.db.session import DBSession, get_db, run_db
 from app.schemas.plan import PlanCreate, PlanResponse, PlanList, PlanUpdate
 from app.schemas.plan_analysis import PlanAnalysisResponse
 from app.services.plan_service import create_plan, get_plans_by_user_id, get_plan_by_id, get_plans_by_type, delete_plan, update_plan
-from app.services.openai_service import analyze_plan
+from app.services.plan_analysis_service import get_or_create_plan_analysis
 from app.services.profile_service import get_profile_by_user_id
-from app.api.v1.routes.chat import get_current_user
+from app.api.v1.dependencies import get_current_user
 from app.models.user import User
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.post("/", response_model=PlanResponse, status_code=status.HTTP_201_CREATED)
-async def create_new_plan(plan: PlanCreate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_new_plan(plan: PlanCreate, current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)):
     """
     Create a new workout or diet plan for the current user
     """
-    return create_plan(db=db, plan=plan, user_id=current_user.id)
+    return await run_db(db, create_plan, plan=plan, user_id=current_user.id)
 
 @router.get("/", response_model=PlanList)
 async def get_all_plans(
-    skip: int = 0, 
-    limit: int = 100, 
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     plan_type: Optional[str] = None,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
-    Get all plans for the current user, optionally filtered by type
+    Get the current user's plans newest first, optionally filtered by type
+    Pass the returned next_cursor back as `cursor` to fetch the next page
     """
-    if plan_type:
-        plans = get_plans_by_type(db, user_id=current_user.id, plan_type=plan_type, skip=skip, limit=limit)
-    else:
-        plans = get_plans_by_user_id(db, user_id=current_user.id, skip=skip, limit=limit)
-    
-    return {"plans": plans}
+    try:
+        if plan_type:
+            plans, next_cursor = await run_db(db, get_plans_by_type, user_id=current_user.id, plan_type=plan_type, limit=limit, cursor=cursor)
+        else:
+            plans, next_cursor = await run_db(db, get_plans_by_user_id, user_id=current_user.id, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    return {"plans": plans, "next_cursor": next_cursor}
 
 @router.get("/{plan_id}", response_model=PlanResponse)
-async def get_plan_details(plan_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def get_plan_details(plan_id: int, current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)):
     """
     Get detailed information about a specific plan
     """
-    plan = get_plan_by_id(db, plan_id=plan_id)
+    plan = await run_db(db, get_plan_by_id, plan_id=plan_id)
     
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
@@ -60,11 +57,11 @@ async def get_plan_details(plan_id: int, current_user: User = Depends(get_curren
     return plan
 
 @router.delete("/{plan_id}", status_code=status.HTTP_200_OK)
-async def delete_plan_endpoint(plan_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> Dict[str, Any]:
+async def delete_plan_endpoint(plan_id: int, current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)) -> Dict[str, Any]:
     """
     Delete a plan by ID
     """
-    plan = get_plan_by_id(db, plan_id=plan_id)
+    plan = await run_db(db, get_plan_by_id, plan_id=plan_id)
     
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
@@ -72,7 +69,7 @@ async def delete_plan_endpoint(plan_id: int, current_user: User = Depends(get_cu
     if plan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this plan")
     
-    result = delete_plan(db, plan_id=plan_id)
+    result = await run_db(db, delete_plan, plan_id=plan_id)
     
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["message"])
@@ -80,11 +77,11 @@ async def delete_plan_endpoint(plan_id: int, current_user: User = Depends(get_cu
     return {"message": "Plan deleted successfully"}
 
 @router.put("/{plan_id}", response_model=PlanResponse)
-async def update_plan_endpoint(plan_id: int, plan_data: PlanUpdate, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_plan_endpoint(plan_id: int, plan_data: PlanUpdate, current_user: User = Depends(get_current_user), db: DBSession = Depends(get_db)):
     """
     Update a plan by ID
     """
-    plan = get_plan_by_id(db, plan_id=plan_id)
+    plan = await run_db(db, get_plan_by_id, plan_id=plan_id)
     
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
@@ -92,7 +89,7 @@ async def update_plan_endpoint(plan_id: int, plan_data: PlanUpdate, current_user
     if plan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this plan")
     
-    updated_plan = update_plan(db, plan_id=plan_id, plan_data=plan_data)
+    updated_plan = await run_db(db, update_plan, plan_id=plan_id, plan_data=plan_data)
     
     if not updated_plan:
         raise HTTPException(status_code=404, detail="Failed to update plan")
@@ -100,11 +97,17 @@ async def update_plan_endpoint(plan_id: int, plan_data: PlanUpdate, current_user
     return updated_plan
 
 @router.get("/{plan_id}/analyze", response_model=PlanAnalysisResponse)
-async def analyze_plan_endpoint(plan_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)):
+async def analyze_plan_endpoint(
+    plan_id: int,
+    refresh: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: DBSession = Depends(get_db)
+):
     """
     Analyze a plan and provide feedback based on user profile data
+    A stored analysis is returned while the plan and profile are unchanged; pass refresh=true to regenerate it
     """
-    plan = get_plan_by_id(db, plan_id=plan_id)
+    plan = await run_db(db, get_plan_by_id, plan_id=plan_id)
     
     if not plan:
         raise HTTPException(status_code=404, detail="Plan not found")
@@ -112,8 +115,8 @@ async def analyze_plan_endpoint(plan_id: int, current_user: User = Depends(get_c
     if plan.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to analyze this plan")
     
-    user_profile = get_profile_by_user_id(db, user_id=current_user.id)
+    user_profile = await run_db(db, get_profile_by_user_id, user_id=current_user.id)
     
-    analysis_result = analyze_plan(plan=plan, user_profile=user_profile)
+    analysis_result = await get_or_create_plan_analysis(db, plan, user_profile=user_profile, refresh=refresh)
     
     return analysis_result
@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timedelta
-from app.db.session import SessionLocal
+from datetime import date, datetime, timedelta
+from app.db.session import DBSession, get_db, run_db
 from fastapi.responses import JSONResponse
 from app.utils.json_encoder import DateTimeEncoder
 import json
-from app.schemas.progress import ProgressCreate, ProgressResponse, ProgressList, ProgressUpdate
+from app.core.config import settings
+from app.schemas.progress import ProgressCreate, ProgressResponse, ProgressList, ProgressUpdate, ProgressImportResult
 from app.services.progress_service import (
     create_progress_entry, 
     get_progress_by_id, 
@@ -15,74 +15,163 @@ from app.services.progress_service import (
     get_recent_progress,
     update_progress,
     delete_progress,
-    get_progress_trends
+    get_progress_trends,
+    get_progress_trends_for_metrics
 )
-from app.services.progress_analysis_service import analyze_progress_data, generate_adaptive_plan
-from app.services.plan_service import create_plan
-from app.api.v1.routes.chat import get_current_user
+from app.services.progress_import_service import InvalidImport, get_import_format, import_progress_entries, parse_progress_upload
+from app.services.progress_stats_service import get_progress_stats
+from app.services.forecast_service import ForecastError, get_goal_forecast
+from app.services.progress_analysis_service import analyze_progress_data, run_progress_analysis_job, run_adaptive_plan_job
+from app.services.job_service import JobQueueFull, get_job_queue, serialize_job
+from app.schemas.job import JobResponse
+from app.api.v1.dependencies import get_current_user
 from app.models.user import User
+from app.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+MAX_TREND_METRICS = 50
 
 @router.post("/", response_model=ProgressResponse, status_code=status.HTTP_201_CREATED)
 async def create_new_progress(
     progress_data: ProgressCreate, 
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
     Create a new progress entry for the current user
     """
-    return create_progress_entry(db=db, progress_data=progress_data, user_id=current_user.id)
+    return await run_db(db, create_progress_entry, progress_data=progress_data, user_id=current_user.id)
+
+@router.post("/import", response_model=ProgressImportResult)
+async def import_progress(
+    request: Request,
+    upload_format: Optional[str] = Query(None, alias="format", description="ndjson or csv; defaults to the Content-Type"),
+    current_user: User = Depends(get_current_user), 
+    db: DBSession = Depends(get_db)
+):
+    """
+    Bulk import progress entries from an NDJSON or CSV request body
+    Every row needs a `date`; CSV uploads use measurement.<key> and workout.<key> columns for those metrics.
+    Invalid rows are reported and skipped, and rows for a day that already has an entry are counted as duplicates.
+    The valid rows are inserted in one transaction.
+    """
+    try:
+        parsed = await parse_progress_upload(
+            request.stream(),
+            get_import_format(request.headers.get("content-type"), upload_format),
+            settings.PROGRESS_IMPORT_MAX_ROWS
+        )
+    except InvalidImport as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    
+    result = await run_db(db, import_progress_entries, user_id=current_user.id, entries=parsed["entries"])
+    return {
+        "rows": parsed["rows"],
+        "imported": result["imported"],
+        "duplicates": parsed["duplicates"] + result["duplicates"],
+        "errors": parsed["errors"],
+        "errors_truncated": parsed["errors_truncated"]
+    }
 
 @router.get("/", response_model=ProgressList)
 async def get_all_progress(
-    skip: int = 0, 
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
     days: Optional[int] = None,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
-    Get all progress entries for the current user
-    Optional: Filter by number of days (recent entries)
+    Get the current user's progress entries newest first
+    Pass the returned next_cursor back as `cursor` to fetch the next page
+    Optional: Filter by number of days (recent entries, returned in one response)
     """
     if days:
-        progress = get_recent_progress(db, user_id=current_user.id, days=days)
-    else:
-        progress = get_progress_by_user_id(db, user_id=current_user.id, skip=skip, limit=limit)
+        progress = await run_db(db, get_recent_progress, user_id=current_user.id, days=days)
+        return {"progress": progress}
+
+    try:
+        progress, next_cursor = await run_db(db, get_progress_by_user_id, user_id=current_user.id, limit=limit, cursor=cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     
-    return {"progress": progress}
+    return {"progress": progress, "next_cursor": next_cursor}
+
+@router.get("/trends")
+async def get_multi_metric_trends(
+    metrics: str = Query(..., description="Comma-separated metrics, e.g. weight,body_fat,measurement.waist"),
+    days: int = 90,
+    current_user: User = Depends(get_current_user), 
+    db: DBSession = Depends(get_db)
+):
+    """
+    Get trends for several progress metrics at once, from a single query
+    """
+    metric_list = list(dict.fromkeys(metric.strip() for metric in metrics.split(",") if metric.strip()))
+    if not metric_list:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="At least one metric is required")
+    if len(metric_list) > MAX_TREND_METRICS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TREND_METRICS} metrics can be requested at once"
+        )
+    
+    trends = await run_db(db, get_progress_trends_for_metrics, user_id=current_user.id, metrics=metric_list, days=days)
+    return {"trends": trends, "period_days": days}
 
 @router.get("/trends/{metric}")
 async def get_metric_trends(
     metric: str,
     days: int = 90,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
     Get trends for a specific progress metric over time
     """
-    return get_progress_trends(db, user_id=current_user.id, metric=metric, days=days)
+    return await run_db(db, get_progress_trends, user_id=current_user.id, metric=metric, days=days)
+
+@router.get("/stats")
+async def get_statistics(
+    days: int = 90,
+    current_user: User = Depends(get_current_user), 
+    db: DBSession = Depends(get_db)
+):
+    """
+    Get locally computed statistics for the user's progress: per-metric trend slopes,
+    moving averages, week-over-week changes, outliers, plateaus and correlations
+    """
+    return await run_db(db, get_progress_stats, user_id=current_user.id, days=days)
+
+@router.get("/forecast")
+async def get_forecast(
+    target: float,
+    metric: str = "weight",
+    target_date: Optional[date] = None,
+    current_user: User = Depends(get_current_user), 
+    db: DBSession = Depends(get_db)
+):
+    """
+    Forecast when the user's weight or body fat reaches `target`
+    Returns the projected date from a robust linear and a damped trend model with confidence
+    bands, and, given a target_date, the required versus observed weekly rate
+    """
+    try:
+        return await run_db(db, get_goal_forecast, user_id=current_user.id, metric=metric, target=target, target_date=target_date)
+    except ForecastError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 @router.get("/analysis", status_code=status.HTTP_200_OK)
 async def analyze_user_progress(
     days: int = 30,
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Analyze user progress data using AI to provide insights and recommendations
     """
-    analysis_result = analyze_progress_data(db, user_id=current_user.id, days=days)
+    analysis_result = await analyze_progress_data(db, user_id=current_user.id, days=days)
     
     if not analysis_result["success"]:
         raise HTTPException(
@@ -95,15 +184,36 @@ async def analyze_user_progress(
         content=json.loads(json.dumps(analysis_result, cls=DateTimeEncoder))
     )
 
-@router.post("/adaptive-plan", status_code=status.HTTP_201_CREATED)
+@router.post("/analysis/jobs", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue_progress_analysis(
+    days: int = 30,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue an AI analysis of the user's progress data and return the job to poll
+    """
+    try:
+        job = get_job_queue().enqueue(
+            current_user.id,
+            "progress_analysis",
+            run_progress_analysis_job,
+            user_id=current_user.id,
+            days=days
+        )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
+    
+    return serialize_job(job)
+
+@router.post("/adaptive-plan", response_model=JobResponse, status_code=status.HTTP_202_ACCEPTED)
 async def create_adaptive_plan(
     plan_type: str,
     original_plan_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+    current_user: User = Depends(get_current_user)
+):
     """
-    Generate an adaptive plan based on user's progress data and profile
+    Queue generation of an adaptive plan based on user's progress data and profile
+    Returns the job right away; poll /api/v1/jobs/{job_id} (or /wait) for the created plan
     """
     valid_plan_types = ["workout", "diet", "meditation"]
     if plan_type.lower() not in valid_plan_types:
@@ -112,43 +222,30 @@ async def create_adaptive_plan(
             detail=f"Invalid plan type. Must be one of: {', '.join(valid_plan_types)}"
         )
     
-    plan_result = generate_adaptive_plan(
-        db, 
-        user_id=current_user.id, 
-        plan_type=plan_type.lower(),
-        original_plan_id=original_plan_id
-    )
-    
-    if not plan_result["success"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=plan_result["message"]
+    try:
+        job = get_job_queue().enqueue(
+            current_user.id,
+            "adaptive_plan",
+            run_adaptive_plan_job,
+            user_id=current_user.id,
+            plan_type=plan_type.lower(),
+            original_plan_id=original_plan_id
         )
+    except JobQueueFull as e:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=str(e))
     
-    new_plan = create_plan(
-        db=db,
-        user_id=current_user.id,
-        plan_type=plan_type.lower(),
-        content=plan_result["content"],
-        is_ai_generated=True
-    )
-    
-    return {
-        "success": True,
-        "message": "Adaptive plan created successfully",
-        "plan": new_plan
-    }
+    return serialize_job(job)
 
 @router.get("/{progress_id}", response_model=ProgressResponse)
 async def get_progress_details(
     progress_id: int, 
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
     Get detailed information about a specific progress entry
     """
-    progress = get_progress_by_id(db, progress_id=progress_id)
+    progress = await run_db(db, get_progress_by_id, progress_id=progress_id)
     
     if not progress:
         raise HTTPException(status_code=404, detail="Progress entry not found")
@@ -163,12 +260,12 @@ async def update_progress_entry(
     progress_id: int, 
     progress_data: ProgressUpdate, 
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ):
     """
     Update a progress entry by ID
     """
-    progress = get_progress_by_id(db, progress_id=progress_id)
+    progress = await run_db(db, get_progress_by_id, progress_id=progress_id)
     
     if not progress:
         raise HTTPException(status_code=404, detail="Progress entry not found")
@@ -176,7 +273,7 @@ async def update_progress_entry(
     if progress.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this progress entry")
     
-    updated_progress = update_progress(db, progress_id=progress_id, progress_data=progress_data)
+    updated_progress = await run_db(db, update_progress, progress_id=progress_id, progress_data=progress_data)
     
     if not updated_progress:
         raise HTTPException(status_code=404, detail="Failed to update progress entry")
@@ -187,12 +284,12 @@ async def update_progress_entry(
 async def delete_progress_entry(
     progress_id: int, 
     current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
+    db: DBSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """
     Delete a progress entry by ID
     """
-    progress = get_progress_by_id(db, progress_id=progress_id)
+    progress = await run_db(db, get_progress_by_id, progress_id=progress_id)
     
     if not progress:
         raise HTTPException(status_code=404, detail="Progress entry not found")
@@ -200,75 +297,9 @@ async def delete_progress_entry(
     if progress.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this progress entry")
     
-    result = delete_progress(db, progress_id=progress_id)
+    result = await run_db(db, delete_progress, progress_id=progress_id)
     
     if not result["success"]:
         raise HTTPException(status_code=404, detail=result["message"])
     
     return {"message": "Progress entry deleted successfully"}
-
-@router.get("/analysis", status_code=status.HTTP_200_OK)
-async def analyze_user_progress(
-    days: int = 30,
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """
-    Analyze user progress data using AI to provide insights and recommendations
-    """
-    analysis_result = analyze_progress_data(db, user_id=current_user.id, days=days)
-    
-    if not analysis_result["success"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=analysis_result["message"]
-        )
-    
-    # Use JSONResponse with custom encoder to handle datetime objects
-    return JSONResponse(
-        content=json.loads(json.dumps(analysis_result, cls=DateTimeEncoder))
-    )
-
-@router.post("/adaptive-plan", status_code=status.HTTP_201_CREATED)
-async def create_adaptive_plan(
-    plan_type: str,
-    original_plan_id: Optional[int] = None,
-    current_user: User = Depends(get_current_user), 
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
-    """
-    Generate an adaptive plan based on user's progress data and profile
-    """
-    valid_plan_types = ["workout", "diet", "meditation"]
-    if plan_type.lower() not in valid_plan_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid plan type. Must be one of: {', '.join(valid_plan_types)}"
-        )
-    
-    plan_result = generate_adaptive_plan(
-        db, 
-        user_id=current_user.id, 
-        plan_type=plan_type.lower(),
-        original_plan_id=original_plan_id
-    )
-    
-    if not plan_result["success"]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=plan_result["message"]
-        )
-    
-    new_plan = create_plan(
-        db=db,
-        user_id=current_user.id,
-        plan_type=plan_type.lower(),
-        content=plan_result["content"],
-        is_ai_generated=True
-    )
-    
-    return {
-        "success": True,
-        "message": "Adaptive plan created successfully",
-        "plan": new_plan
-    }
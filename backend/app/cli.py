@@ -0,0 +1,52 @@
+import argparse
+import sys
+from app.db.session import SessionLocal
+from app.services.export_service import EXPORT_DATASETS, EXPORT_FORMATS, ExportError, export_user_data
+from app.services.progress_rollup_service import backfill_progress_rollups
+
+def backfill_rollups(args: argparse.Namespace) -> None:
+    """
+    Rebuild progress rollups from raw progress entries
+    """
+    with SessionLocal() as db:
+        result = backfill_progress_rollups(db, user_id=args.user_id)
+    print(f"Rebuilt {result['rollups']} rollups for {result['users']} users")
+
+def export_data(args: argparse.Namespace) -> None:
+    """
+    Stream a user's dataset to a file, or stdout by default
+    """
+    with SessionLocal() as db:
+        try:
+            chunks = export_user_data(db, args.user_id, args.dataset, args.format)
+        except ExportError as e:
+            sys.exit(str(e))
+        if args.output == "-":
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+        else:
+            with open(args.output, "wb") as output:
+                for chunk in chunks:
+                    output.write(chunk)
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="AI Gym Coach maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    backfill = subparsers.add_parser("backfill-rollups", help="Rebuild daily/weekly progress rollups")
+    backfill.add_argument("--user-id", type=int, default=None, help="Only rebuild this user's rollups")
+    backfill.set_defaults(func=backfill_rollups)
+
+    export = subparsers.add_parser("export", help="Export a user's progress, chat or plans data")
+    export.add_argument("dataset", choices=list(EXPORT_DATASETS))
+    export.add_argument("--user-id", type=int, required=True, help="User whose data is exported")
+    export.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson", help="Output format (parquet needs pyarrow)")
+    export.add_argument("--output", "-o", default="-", help="Output file, or - for stdout")
+    export.set_defaults(func=export_data)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+if __name__ == "__main__":
+    main()
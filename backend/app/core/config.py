@@ -5,9 +5,48 @@ load_dotenv()
 class Settings:
     PROJECT_NAME: str = "AI Gym Coach Backend"
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./test.db")
+    RUN_MIGRATIONS_ON_STARTUP: bool = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "true").lower() == "true"
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    SQLITE_JOURNAL_MODE: str = os.getenv("SQLITE_JOURNAL_MODE", "wal")
+    SQLITE_SYNCHRONOUS: str = os.getenv("SQLITE_SYNCHRONOUS", "normal")
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    SQLITE_MMAP_SIZE: int = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
     SECRET_KEY: str = os.getenv("SECRET_KEY", "supersecret")
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY")
+    OPENAI_TIMEOUT: float = float(os.getenv("OPENAI_TIMEOUT", "60"))
+    OPENAI_CONNECT_TIMEOUT: float = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+    OPENAI_MAX_RETRIES: int = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+    OPENAI_MAX_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    OPENAI_KEEPALIVE_EXPIRY: float = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "30"))
+    CACHE_URL: str = os.getenv("CACHE_URL", "")
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+    PROGRESS_ANALYSIS_CACHE_TTL: float = float(os.getenv("PROGRESS_ANALYSIS_CACHE_TTL", "3600"))
+    FORECAST_CACHE_TTL: float = float(os.getenv("FORECAST_CACHE_TTL", "86400"))
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+    PRINCIPAL_CACHE_TTL: float = float(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+    TOKEN_VERSION_CACHE_TTL: float = float(os.getenv("TOKEN_VERSION_CACHE_TTL", "30"))
+    TREND_ROLLUP_MIN_DAYS: int = int(os.getenv("TREND_ROLLUP_MIN_DAYS", "365"))
+    PROGRESS_IMPORT_MAX_ROWS: int = int(os.getenv("PROGRESS_IMPORT_MAX_ROWS", "20000"))
+    PROGRESS_ANALYSIS_PROMPT_TOKENS: int = int(os.getenv("PROGRESS_ANALYSIS_PROMPT_TOKENS", "2500"))
+    ADAPTIVE_PLAN_PROMPT_TOKENS: int = int(os.getenv("ADAPTIVE_PLAN_PROMPT_TOKENS", "2500"))
+    CHAT_MEMORY_TURNS: int = int(os.getenv("CHAT_MEMORY_TURNS", "4"))
+    CHAT_MEMORY_MESSAGE_CHARS: int = int(os.getenv("CHAT_MEMORY_MESSAGE_CHARS", "2000"))
+    CHAT_SUMMARY_MIN_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_MIN_MESSAGES", "6"))
+    CHAT_SUMMARY_BATCH_MESSAGES: int = int(os.getenv("CHAT_SUMMARY_BATCH_MESSAGES", "40"))
+    CHAT_SUMMARY_MAX_TOKENS: int = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_HISTORY_SIZE: int = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+    JOB_QUEUE_MAX_SIZE: int = int(os.getenv("JOB_QUEUE_MAX_SIZE", "200"))
+    JOB_MAX_PENDING_PER_USER: int = int(os.getenv("JOB_MAX_PENDING_PER_USER", "3"))
+    JOB_WAIT_MAX_TIMEOUT: float = float(os.getenv("JOB_WAIT_MAX_TIMEOUT", "60"))
 
 settings = Settings()
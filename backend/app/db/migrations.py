@@ -0,0 +1,30 @@
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
+from app.db.session import engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Revision matching the schema that Base.metadata.create_all used to build
+BASELINE_REVISION = "0001"
+
+def get_alembic_config() -> Config:
+    """
+    Alembic config for the backend, usable from any working directory
+    """
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+def run_migrations() -> None:
+    """
+    Upgrade the database to the latest revision
+    Databases created before migrations existed are stamped at the baseline first
+    """
+    config = get_alembic_config()
+    table_names = set(inspect(engine).get_table_names())
+    if "users" in table_names and "alembic_version" not in table_names:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
@@ -0,0 +1,147 @@
+import time
+from threading import Lock
+from typing import Any, Dict
+from sqlalchemy import event
+from sqlalchemy.engine import URL, Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+
+SQLITE_JOURNAL_MODES = ("delete", "truncate", "persist", "memory", "wal", "off")
+SQLITE_SYNCHRONOUS_MODES = ("off", "normal", "full", "extra")
+
+class PoolWaitStats:
+    """
+    Running totals of how long checkouts waited for a pooled connection
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self.lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max
+            }
+
+class TimedPoolMixin:
+    """
+    Times every checkout from the pool, including waits for a free connection when it is exhausted
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wait_stats = PoolWaitStats()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+            raise
+        self.wait_stats.record(time.perf_counter() - start)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a recreated pool; keep the running totals
+        pool = super().recreate()
+        pool.wait_stats = self.wait_stats
+        return pool
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+def is_memory_database(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and (
+        url.database in (None, "", ":memory:") or url.query.get("mode") == "memory"
+    )
+
+def get_engine_options(url: URL, is_async: bool = False) -> Dict[str, Any]:
+    """
+    create_engine keyword arguments for the pool profile in settings
+    In-memory SQLite keeps SQLAlchemy's single-connection pool, since each new connection is a new database.
+    """
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if url.get_backend_name() == "sqlite" and not is_async:
+        options["connect_args"] = {"check_same_thread": False}
+    if is_memory_database(url):
+        return options
+    options.update(
+        poolclass=TimedAsyncQueuePool if is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE
+    )
+    return options
+
+def get_sqlite_pragmas(url: URL) -> Dict[str, Any]:
+    """
+    Per-connection SQLite pragmas from settings: WAL lets readers run alongside a writer,
+    synchronous=NORMAL is durable under WAL with far fewer fsyncs, busy_timeout makes writers
+    wait for the lock instead of failing, and mmap_size serves reads from mapped pages
+    """
+    journal_mode = settings.SQLITE_JOURNAL_MODE.lower()
+    synchronous = settings.SQLITE_SYNCHRONOUS.lower()
+    if journal_mode not in SQLITE_JOURNAL_MODES:
+        raise ValueError(f"SQLITE_JOURNAL_MODE must be one of: {', '.join(SQLITE_JOURNAL_MODES)}")
+    if synchronous not in SQLITE_SYNCHRONOUS_MODES:
+        raise ValueError(f"SQLITE_SYNCHRONOUS must be one of: {', '.join(SQLITE_SYNCHRONOUS_MODES)}")
+
+    pragmas: Dict[str, Any] = {
+        "synchronous": synchronous,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        "mmap_size": settings.SQLITE_MMAP_SIZE
+    }
+    # The journal mode of an in-memory database is always "memory"
+    if not is_memory_database(url):
+        pragmas = {"journal_mode": journal_mode, **pragmas}
+    return pragmas
+
+def configure_sqlite(engine: Engine) -> None:
+    """
+    Apply the settings' SQLite pragmas to every new connection of a (sync or async-backing) engine
+    """
+    pragmas = get_sqlite_pragmas(engine.url)
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def get_pool_status(engine: Engine) -> Dict[str, Any]:
+    """
+    Current pool occupancy and cumulative checkout waits for an engine
+    """
+    pool = engine.pool
+    status: Dict[str, Any] = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout()
+        )
+    if isinstance(pool, TimedPoolMixin):
+        status.update(pool.wait_stats.snapshot())
+    return status
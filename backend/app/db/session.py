@@ -1,10 +1,101 @@
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from starlette.concurrency import run_in_threadpool
+from typing import Any, AsyncIterator, Callable, Dict, TypeVar, Union
 from app.core.config import settings
+from app.db.pool import configure_sqlite, get_engine_options, get_pool_status
 
-engine = create_engine(
-    settings.DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {}
+T = TypeVar("T")
+
+# Async driver used for each backend when DATABASE_URL selects async mode,
+# e.g. postgresql+asyncpg://... or sqlite+aiosqlite:///./test.db
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+database_url = make_url(settings.DATABASE_URL)
+ASYNC_DB_ENABLED = database_url.get_driver_name() == ASYNC_DRIVERS.get(database_url.get_backend_name())
+
+# The sync engine is always available (DDL, scripts); in async mode it talks to
+# the same database through the backend's default sync driver.
+sync_database_url = database_url.set(drivername=database_url.get_backend_name()) if ASYNC_DB_ENABLED else database_url
+
+# Pool sizing, pre-ping and recycling come from settings (see app/db/pool.py)
+engine = create_engine(sync_database_url, **get_engine_options(sync_database_url))
+# Like the async sessions, committed objects stay loaded so they remain usable after
+# release_db() hands the connection back
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
+
+async_engine = create_async_engine(database_url, **get_engine_options(database_url, is_async=True)) if ASYNC_DB_ENABLED else None
+AsyncSessionLocal = (
+    async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False) if ASYNC_DB_ENABLED else None
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if database_url.get_backend_name() == "sqlite":
+    configure_sqlite(engine)
+    if async_engine is not None:
+        configure_sqlite(async_engine.sync_engine)
+
 Base = declarative_base()
+
+DBSession = Union[Session, AsyncSession]
+
+@asynccontextmanager
+async def session_scope() -> AsyncIterator[DBSession]:
+    """
+    Open a session outside the request lifecycle (streaming responses, background work)
+    Yields an AsyncSession in async mode, or a sync Session otherwise
+    """
+    if ASYNC_DB_ENABLED:
+        async with AsyncSessionLocal() as db:
+            yield db
+    else:
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            await run_in_threadpool(db.close)
+
+async def get_db():
+    """
+    FastAPI dependency yielding a database session for the request
+    """
+    async with session_scope() as db:
+        yield db
+
+async def release_db(db: DBSession) -> None:
+    """
+    Return the session's connection to the pool before a slow non-database await (LLM calls)
+
+    Objects already loaded stay usable, detached from the session; the session checks out
+    a connection again on its next query.
+    """
+    if isinstance(db, AsyncSession):
+        await db.close()
+    else:
+        await run_in_threadpool(db.close)
+
+async def run_db(db: Any, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Await a sync service function without blocking the event loop.
+
+    With an AsyncSession the function runs through ``run_sync`` so its queries go
+    through the async driver; with a sync Session it runs in the threadpool.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(lambda session: fn(session, *args, **kwargs))
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+def get_pool_stats() -> Dict[str, Any]:
+    """
+    Connection pool statistics for the sync engine and, in async mode, the async engine
+    """
+    stats = {"sync": get_pool_status(engine)}
+    if async_engine is not None:
+        stats["async"] = get_pool_status(async_engine.sync_engine)
+    return stats
@@ -1,14 +1,31 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import auth, chat, plans, profiles, progress
+from starlette.concurrency import run_in_threadpool
+from app.api.v1.routes import auth, chat, plans, profiles, progress, jobs, export
 from app.core.config import settings
-from app.db.session import engine
-from app.models.base import Base
-from app.models.profile import UserProfile
-from app.models.progress import Progress
-from app.models.chat import ChatMessage
+from app.db.migrations import run_migrations
+from app.db.session import async_engine, engine, get_pool_stats
+from app.services.openai_service import init_openai_client, close_openai_client
+from app.services.job_service import job_queue
+from app.utils.metrics import METRICS_CONTENT_TYPE, MetricsMiddleware, instrument_engine, register_pool_collector, render_metrics
+from app.utils.password import shutdown_hash_executor
 
-Base.metadata.create_all(bind=engine)
+instrument_engine(engine, "sync")
+if async_engine is not None:
+    instrument_engine(async_engine.sync_engine, "async")
+register_pool_collector(get_pool_stats)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.RUN_MIGRATIONS_ON_STARTUP:
+        await run_in_threadpool(run_migrations)
+    init_openai_client()
+    await job_queue.start()
+    yield
+    await job_queue.stop()
+    await close_openai_client()
+    await run_in_threadpool(shutdown_hash_executor)
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -17,6 +34,7 @@ app = FastAPI(
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,12 +44,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(chat.router, prefix="/api/v1/chat", tags=["Chat"])
 app.include_router(plans.router, prefix="/api/v1/plans", tags=["Plans"])
 app.include_router(profiles.router, prefix="/api/v1/profiles", tags=["Profiles"])
 app.include_router(progress.router, prefix="/api/v1/progress", tags=["Progress"])
+app.include_router(jobs.router, prefix="/api/v1/jobs", tags=["Jobs"])
+app.include_router(export.router, prefix="/api/v1/export", tags=["Export"])
 
 @app.get("/", include_in_schema=False)
 async def root():
     return {"message": "Welcome to AI Gym Coach API. Visit /api/docs for the API documentation."}
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Prometheus metrics: route latency, database statements and pool, and LLM calls
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
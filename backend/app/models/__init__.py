@@ -1,6 +1,10 @@
 from app.models.base import Base
 from app.models.user import User
 from app.models.plan import Plan
+from app.models.plan_analysis import PlanAnalysis
 from app.models.profile import UserProfile, FitnessLevel, FitnessGoal
+from app.models.progress import Progress
+from app.models.progress_rollup import ProgressRollup
+from app.models.chat import ChatMessage, ChatMemory
 
-__all__ = ["Base", "User", "Plan", "UserProfile", "FitnessLevel", "FitnessGoal"]
+__all__ = ["Base", "User", "Plan", "PlanAnalysis", "UserProfile", "FitnessLevel", "FitnessGoal", "Progress", "ProgressRollup", "ChatMessage", "ChatMemory"]
@@ -1 +1,8 @@
+from datetime import datetime, timezone
 from app.db.session import Base
+
+def utcnow() -> datetime:
+    """
+    Current UTC time, used as the app-side default for row timestamps
+    """
+    return datetime.now(timezone.utc)
@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
-from app.models.base import Base
+from app.models.base import Base, utcnow
 from uuid import uuid4
 
 class ChatMessage(Base):
@@ -11,8 +11,24 @@ class ChatMessage(Base):
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     role = Column(String, nullable=False)
     content = Column(Text, nullable=False)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
+    timestamp = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     is_plan = Column(Boolean, default=False)
     plan_type = Column(String, nullable=True)
     
+    __table_args__ = (
+        Index("ix_chat_messages_user_id_timestamp_id", "user_id", "timestamp", "id"),
+    )
+    
     user = relationship("User", back_populates="chat_messages")
+
+class ChatMemory(Base):
+    """
+    Rolling summary of a user's older chat messages, used as conversational memory
+    """
+    __tablename__ = "chat_memories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
+    summary = Column(Text, nullable=False, default="")
+    summarized_until = Column(DateTime(timezone=True), nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
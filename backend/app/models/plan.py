@@ -1,8 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
-from app.models.base import Base
+from app.models.base import Base, utcnow
 
 class PlanType(str, enum.Enum):
     WORKOUT = "workout"
@@ -15,6 +15,12 @@ class Plan(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     type = Column(String(50))
     content = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_plans_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_plans_user_id_type_created_at_id", "user_id", "type", "created_at", "id"),
+    )
     
     user = relationship("User", back_populates="plans")
+    analyses = relationship("PlanAnalysis", back_populates="plan", cascade="all, delete-orphan")
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.models.base import Base
+from uuid import uuid4
+
+class PlanAnalysis(Base):
+    """
+    Stored AI analysis of a plan, keyed by the inputs it was generated from
+    """
+    __tablename__ = "plan_analyses"
+
+    id = Column(String, primary_key=True, index=True, default=lambda: str(uuid4()))
+    plan_id = Column(Integer, ForeignKey("plans.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    profile_fingerprint = Column(String(64), nullable=False)
+    analysis = Column(Text, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("plan_id", "content_hash", "profile_fingerprint", name="uq_plan_analyses_inputs"),
+    )
+
+    plan = relationship("Plan", back_populates="analyses")
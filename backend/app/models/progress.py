@@ -1,7 +1,7 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, JSON, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
-from app.models.base import Base
+from app.models.base import Base, utcnow
 
 class Progress(Base):
     """
@@ -11,7 +11,7 @@ class Progress(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    date = Column(DateTime(timezone=True), server_default=func.now())
+    date = Column(DateTime(timezone=True), default=utcnow, server_default=func.now())
     
     weight = Column(Float, nullable=True)
     body_fat = Column(Float, nullable=True)
@@ -26,4 +26,8 @@ class Progress(Base):
     
     notes = Column(String(500), nullable=True)
     
+    __table_args__ = (
+        Index("ix_progress_user_id_date_id", "user_id", "date", "id"),
+    )
+    
     user = relationship("User", back_populates="progress")
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, Float, String, Date, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.sql import func
+from app.models.base import Base, utcnow
+
+class ProgressRollup(Base):
+    """
+    Per-user daily or weekly aggregate of one progress metric
+    Rebuilt for the affected buckets whenever a progress entry is written
+    """
+    __tablename__ = "progress_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # "day" or "week" (weeks start on Monday)
+    period = Column(String(8), nullable=False)
+    period_start = Column(Date, nullable=False)
+    # "weight", "measurement.waist", "workout.squat", ...
+    metric = Column(String(100), nullable=False)
+    count = Column(Integer, nullable=False)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+    avg = Column(Float, nullable=False)
+    first = Column(Float, nullable=False)
+    last = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), default=utcnow, server_default=func.now(), onupdate=utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "metric", "period", "period_start", name="uq_progress_rollups_bucket"),
+    )
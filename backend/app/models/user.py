@@ -10,6 +10,8 @@ class User(Base):
     email = Column(String, unique=True, index=True)
     hashed_password = Column(String)
     is_active = Column(Boolean, default=True)
+    # Bumped to revoke every token issued to the user
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")
     
     plans = relationship("Plan", back_populates="user")
     profile = relationship("UserProfile", back_populates="user", uselist=False)
@@ -47,3 +47,4 @@ class ChatHistoryItem(BaseModel):
 
 class ChatHistory(BaseModel):
     messages: List[ChatHistoryItem]
+    next_cursor: Optional[str] = None
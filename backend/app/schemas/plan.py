@@ -30,3 +30,4 @@ class PlanResponse(PlanBase):
 
 class PlanList(BaseModel):
     plans: list[PlanResponse]
+    next_cursor: Optional[str] = None
@@ -10,3 +10,4 @@ class PlanAnalysisResponse(BaseModel):
     plan_id: int
     analysis: str
     timestamp: datetime
+    cached: bool = False
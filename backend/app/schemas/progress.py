@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from datetime import datetime
 
 class ProgressBase(BaseModel):
@@ -33,3 +33,21 @@ class ProgressResponse(ProgressBase):
 class ProgressList(BaseModel):
     """Schema for a list of progress entries"""
     progress: list[ProgressResponse]
+    next_cursor: Optional[str] = None
+
+class ProgressImport(ProgressCreate):
+    """Schema for one row of a bulk progress import"""
+    date: datetime
+
+class ProgressImportRowError(BaseModel):
+    """Validation errors for one row of a bulk progress import"""
+    row: int
+    errors: List[str]
+
+class ProgressImportResult(BaseModel):
+    """Schema for the outcome of a bulk progress import"""
+    rows: int
+    imported: int
+    duplicates: int
+    errors: List[ProgressImportRowError]
+    errors_truncated: bool = False
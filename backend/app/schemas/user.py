@@ -25,3 +25,6 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     username: Optional[str] = None
+    uid: Optional[int] = None
+    is_active: Optional[bool] = None
+    token_version: Optional[int] = None
@@ -0,0 +1,162 @@
+from typing import Any, Dict, Optional
+from uuid import uuid4
+from app.core.config import settings
+from app.utils.cache import CacheBackend, create_cache
+
+# One entry per user holding the analyses for each requested `days` window,
+# so a single delete invalidates all of them.
+progress_analysis_cache = create_cache(
+    "progress_analysis",
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.PROGRESS_ANALYSIS_CACHE_TTL
+)
+
+# Current data generation per user for the progress analysis cache. Invalidation replaces it,
+# so an analysis computed from data read before a write is never served after that write.
+progress_analysis_generations = create_cache(
+    "progress_analysis_generation",
+    maxsize=settings.CACHE_MAX_ENTRIES
+)
+
+# Fitted forecast models per user, keyed by metric inside the entry; dropped on any progress write
+forecast_cache = create_cache(
+    "forecast",
+    maxsize=settings.CACHE_MAX_ENTRIES,
+    ttl=settings.FORECAST_CACHE_TTL
+)
+forecast_generations = create_cache(
+    "forecast_generation",
+    maxsize=settings.CACHE_MAX_ENTRIES
+)
+
+# Authenticated principals by username, so authenticated requests skip the user lookup.
+# The TTL bounds how long another worker's in-process copy can outlive an invalidation.
+principal_cache = create_cache(
+    "principal",
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
+
+# Current token version per user id, checked against the `ver` claim of stateless tokens
+token_version_cache = create_cache(
+    "token_version",
+    maxsize=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+    ttl=settings.TOKEN_VERSION_CACHE_TTL
+)
+
+def get_generation(generations: CacheBackend, user_id: int) -> str:
+    """
+    Get a user's current data generation, starting a new one if none is recorded
+    Generations are random tokens rather than counters, so an evicted generation is never reissued
+    """
+    generation = generations.get(str(user_id))
+    if generation is None:
+        generation = uuid4().hex
+        generations.set(str(user_id), generation)
+    return generation
+
+def bump_generation(generations: CacheBackend, user_id: int) -> None:
+    generations.set(str(user_id), uuid4().hex)
+
+def get_progress_analysis_generation(user_id: int) -> str:
+    """
+    Get the generation to pass to cache_progress_analysis; read it before reading the user's data
+    """
+    return get_generation(progress_analysis_generations, user_id)
+
+def get_cached_progress_analysis(user_id: int, days: int) -> Optional[Dict[str, Any]]:
+    """
+    Get a cached progress analysis for a user and analysis window
+    """
+    entry = progress_analysis_cache.get(str(user_id))
+    if not entry or entry["generation"] != progress_analysis_generations.get(str(user_id)):
+        return None
+    return entry["analyses"].get(str(days))
+
+def cache_progress_analysis(user_id: int, days: int, analysis: Dict[str, Any], generation: str) -> None:
+    """
+    Cache a progress analysis for a user and analysis window, computed from data read at `generation`
+    Nothing is cached if the user's data changed since; entries from older generations are never served
+    """
+    if generation != progress_analysis_generations.get(str(user_id)):
+        return
+    entry = progress_analysis_cache.get(str(user_id))
+    analyses = entry["analyses"] if entry and entry["generation"] == generation else {}
+    analyses[str(days)] = analysis
+    progress_analysis_cache.set(str(user_id), {"generation": generation, "analyses": analyses})
+
+def invalidate_progress_analysis(user_id: int) -> None:
+    """
+    Drop all cached progress analyses for a user after their progress, profile or plans change
+    """
+    bump_generation(progress_analysis_generations, user_id)
+    progress_analysis_cache.delete(str(user_id))
+
+def get_forecast_generation(user_id: int) -> str:
+    """
+    Get the generation to pass to cache_forecast_model; read it before reading the user's progress
+    """
+    return get_generation(forecast_generations, user_id)
+
+def get_cached_forecast_model(user_id: int, metric: str) -> Optional[Dict[str, Any]]:
+    """
+    Get a user's cached fitted forecast model for a metric
+    """
+    entry = forecast_cache.get(str(user_id))
+    if not entry or entry["generation"] != forecast_generations.get(str(user_id)):
+        return None
+    return entry["models"].get(metric)
+
+def cache_forecast_model(user_id: int, metric: str, model: Dict[str, Any], generation: str) -> None:
+    """
+    Cache a user's fitted forecast model for a metric, fitted from progress read at `generation`
+    """
+    if generation != forecast_generations.get(str(user_id)):
+        return
+    entry = forecast_cache.get(str(user_id))
+    models = entry["models"] if entry and entry["generation"] == generation else {}
+    models[metric] = model
+    forecast_cache.set(str(user_id), {"generation": generation, "models": models})
+
+def invalidate_forecasts(user_id: int) -> None:
+    """
+    Drop a user's cached forecast models after their progress changes
+    """
+    bump_generation(forecast_generations, user_id)
+    forecast_cache.delete(str(user_id))
+
+def get_cached_principal(username: str) -> Optional[Dict[str, Any]]:
+    """
+    Get the cached principal for a username
+    """
+    return principal_cache.get(username)
+
+def cache_principal(username: str, principal: Dict[str, Any]) -> None:
+    """
+    Cache the principal for a username
+    """
+    principal_cache.set(username, principal)
+
+def invalidate_principal(username: str) -> None:
+    """
+    Drop a cached principal after the user's account state changes
+    """
+    principal_cache.delete(username)
+
+def get_cached_token_version(user_id: int) -> Optional[int]:
+    """
+    Get the cached token version for a user
+    """
+    return token_version_cache.get(str(user_id))
+
+def cache_token_version(user_id: int, token_version: int) -> None:
+    """
+    Cache the token version for a user
+    """
+    token_version_cache.set(str(user_id), token_version)
+
+def invalidate_token_version(user_id: int) -> None:
+    """
+    Drop a cached token version after the user's tokens are revoked
+    """
+    token_version_cache.delete(str(user_id))
@@ -0,0 +1,113 @@
+import asyncio
+import logging
+import weakref
+from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.db.session import run_db, session_scope
+from app.models.chat import ChatMessage, ChatMemory
+from app.services.openai_service import summarize_conversation
+from app.services.prompt_builder import summarize_text
+
+logger = logging.getLogger(__name__)
+
+# One summary update at a time per user, so concurrent turns don't fold the same messages twice
+_summary_locks: "weakref.WeakValueDictionary[int, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def _as_prompt_message(message: ChatMessage) -> Dict[str, str]:
+    return {
+        "role": message.role,
+        "content": summarize_text(message.content, settings.CHAT_MEMORY_MESSAGE_CHARS)
+    }
+
+def get_chat_memory(db: Session, user_id: int) -> Optional[ChatMemory]:
+    """
+    Get the stored conversation summary for a user
+    """
+    return db.query(ChatMemory).filter(ChatMemory.user_id == user_id).first()
+
+def get_recent_chat_messages(db: Session, user_id: int, limit: int) -> List[ChatMessage]:
+    """
+    Get a user's most recent chat messages in chronological order
+    """
+    messages = db.query(ChatMessage).filter(
+        ChatMessage.user_id == user_id
+    ).order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc()).limit(limit).all()
+    return list(reversed(messages))
+
+def get_chat_context(db: Session, user_id: int) -> Dict[str, Any]:
+    """
+    Build the bounded conversational context for the next chat turn:
+    the last CHAT_MEMORY_TURNS turns verbatim plus the rolling summary of older ones
+    """
+    memory = get_chat_memory(db, user_id)
+    recent = get_recent_chat_messages(db, user_id, settings.CHAT_MEMORY_TURNS * 2)
+    return {
+        "summary": memory.summary if memory and memory.summary else None,
+        "history": [_as_prompt_message(message) for message in recent]
+    }
+
+def get_unsummarized_messages(db: Session, user_id: int) -> List[ChatMessage]:
+    """
+    Get the oldest batch of messages that are outside the verbatim window and not yet in the summary
+    """
+    recent = get_recent_chat_messages(db, user_id, settings.CHAT_MEMORY_TURNS * 2)
+    if len(recent) < settings.CHAT_MEMORY_TURNS * 2:
+        return []
+
+    memory = get_chat_memory(db, user_id)
+    query = db.query(ChatMessage).filter(
+        ChatMessage.user_id == user_id,
+        ChatMessage.timestamp < recent[0].timestamp
+    )
+    if memory and memory.summarized_until:
+        query = query.filter(ChatMessage.timestamp > memory.summarized_until)
+
+    batch = query.order_by(ChatMessage.timestamp, ChatMessage.id).limit(settings.CHAT_SUMMARY_BATCH_MESSAGES).all()
+    if len(batch) == settings.CHAT_SUMMARY_BATCH_MESSAGES:
+        # Leave messages sharing the last timestamp for the next pass so none are skipped
+        boundary = batch[-1].timestamp
+        batch = [message for message in batch if message.timestamp < boundary] or batch
+    return batch
+
+def save_chat_summary(db: Session, user_id: int, summary: str, summarized_until) -> ChatMemory:
+    """
+    Store the updated conversation summary for a user
+    """
+    memory = get_chat_memory(db, user_id)
+    if memory is None:
+        memory = ChatMemory(user_id=user_id)
+        db.add(memory)
+    memory.summary = summary
+    memory.summarized_until = summarized_until
+    db.commit()
+    return memory
+
+async def update_chat_summary(user_id: int) -> None:
+    """
+    Fold messages that fell out of the verbatim window into the user's rolling summary
+    Runs in the background after a chat turn; no connection is held during the LLM call
+    """
+    lock = _summary_locks.get(user_id)
+    if lock is None:
+        lock = _summary_locks[user_id] = asyncio.Lock()
+
+    async with lock:
+        async with session_scope() as db:
+            memory = await run_db(db, get_chat_memory, user_id)
+            batch = await run_db(db, get_unsummarized_messages, user_id)
+
+        if len(batch) < settings.CHAT_SUMMARY_MIN_MESSAGES:
+            return
+
+        try:
+            summary = await summarize_conversation(
+                memory.summary if memory else None,
+                [_as_prompt_message(message) for message in batch]
+            )
+        except Exception as e:
+            logger.warning("Could not update chat summary for user %s: %s", user_id, e)
+            return
+
+        async with session_scope() as db:
+            await run_db(db, save_chat_summary, user_id, summary, batch[-1].timestamp)
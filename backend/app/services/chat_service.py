@@ -1,32 +1,49 @@
+import anyio
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from app.models.base import utcnow
 from app.models.chat import ChatMessage
 from app.schemas.chat import ChatMessageCreate, ChatMessageUpdate
-from app.services.openai_service import generate_ai_response
+from app.services.openai_service import generate_ai_response, stream_ai_response
+from app.db.session import DBSession, release_db, run_db, session_scope
+from app.services.chat_memory_service import get_chat_context
+from app.utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
 from uuid import uuid4
 
-def create_chat_message(db: Session, message: ChatMessageCreate, user_id: str) -> ChatMessage:
+def build_chat_message(message: ChatMessageCreate, user_id: str, message_id: Optional[str] = None) -> ChatMessage:
     """
-    Create a new chat message in the database
+    Build a chat message with its id and timestamp set application-side, so saving it needs no refresh
     """
-    db_message = ChatMessage(
-        id=str(uuid4()),
+    return ChatMessage(
+        id=message_id or str(uuid4()),
         user_id=user_id,
         role=message.role,
         content=message.content,
+        timestamp=utcnow(),
         is_plan=message.is_plan,
         plan_type=message.plan_type
     )
-    db.add(db_message)
+
+def save_chat_messages(db: Session, messages: List[ChatMessage]) -> List[ChatMessage]:
+    """
+    Insert chat messages in a single commit
+    """
+    db.add_all(messages)
     db.commit()
-    db.refresh(db_message)
-    return db_message
+    return messages
 
-def get_chat_messages_by_user_id(db: Session, user_id: str, skip: int = 0, limit: int = 100) -> List[ChatMessage]:
+def create_chat_message(db: Session, message: ChatMessageCreate, user_id: str, message_id: Optional[str] = None) -> ChatMessage:
     """
-    Get all chat messages for a specific user
+    Create a new chat message in the database
     """
-    return db.query(ChatMessage).filter(ChatMessage.user_id == user_id).order_by(ChatMessage.timestamp).offset(skip).limit(limit).all()
+    return save_chat_messages(db, [build_chat_message(message, user_id, message_id)])[0]
+
+def get_chat_messages_by_user_id(db: Session, user_id: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[ChatMessage], Optional[str]]:
+    """
+    Get a page of a user's chat messages, newest first, and the cursor for the next page
+    """
+    query = db.query(ChatMessage).filter(ChatMessage.user_id == user_id)
+    return paginate_keyset(query, ChatMessage.timestamp, ChatMessage.id, limit, cursor)
 
 def get_chat_message_by_id(db: Session, message_id: str) -> Optional[ChatMessage]:
     """
@@ -59,30 +76,88 @@ def update_chat_message(db: Session, message_id: str, message_update: ChatMessag
             message.plan_type = message_update.plan_type
         
         db.commit()
-        db.refresh(message)
         return message
     return None
 
-def process_user_message(db: Session, message_content: str, user_id: str, user_profile=None):
+async def process_user_message(db: DBSession, message_content: str, user_id: str, user_profile=None):
     """
-    Process a user message, store it in the database, generate an AI response, and store that too
+    Process a user message, generate an AI response, and store both in one commit
+    The turn is a short read, the AI call with no connection held, and a single write
     """
-    user_message = ChatMessageCreate(
-        content=message_content,
-        role="user"
-    )
-    db_user_message = create_chat_message(db, user_message, user_id)
+    context = await run_db(db, get_chat_context, user_id)
     
-    ai_response = generate_ai_response(message_content, user_profile=user_profile)
+    # Built now so the user message is timestamped when it arrived, ahead of the reply
+    user_message = build_chat_message(ChatMessageCreate(content=message_content, role="user"), user_id)
     
-    assistant_message = ChatMessageCreate(
-        content=ai_response["response"],
-        role="assistant"
+    await release_db(db)
+    
+    ai_response = await generate_ai_response(
+        message_content,
+        user_profile=user_profile,
+        history=context["history"],
+        summary=context["summary"]
     )
-    db_assistant_message = create_chat_message(db, assistant_message, user_id)
+    
+    assistant_message = build_chat_message(ChatMessageCreate(content=ai_response["response"], role="assistant"), user_id)
+    await run_db(db, save_chat_messages, [user_message, assistant_message])
     
     return {
-        "message_id": db_assistant_message.id,
-        "response": db_assistant_message.content,
-        "timestamp": db_assistant_message.timestamp
+        "message_id": assistant_message.id,
+        "response": assistant_message.content,
+        "timestamp": assistant_message.timestamp
+    }
+
+async def stream_user_message(db: DBSession, message_content: str, user_id: str, user_profile=None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Return a stream of events for the AI response to a user message
+    The request's connection is released before streaming; the user message and the response
+    are stored in one commit once the stream ends, including when the client disconnects mid-stream
+    """
+    context = await run_db(db, get_chat_context, user_id)
+    
+    tokens = stream_ai_response(
+        message_content,
+        user_profile=user_profile,
+        history=context["history"],
+        summary=context["summary"]
+    )
+    await release_db(db)
+    
+    user_message = build_chat_message(ChatMessageCreate(content=message_content, role="user"), user_id)
+    return _stream_assistant_message(tokens, user_message, user_id)
+
+async def _stream_assistant_message(tokens: AsyncIterator[str], user_message: ChatMessage, user_id: str) -> AsyncIterator[Dict[str, Any]]:
+    message_id = str(uuid4())
+    chunks: List[str] = []
+    assistant_message = None
+    
+    yield {"event": "start", "data": {"message_id": message_id}}
+    
+    try:
+        try:
+            async for token in tokens:
+                chunks.append(token)
+                yield {"event": "token", "data": {"content": token}}
+        except Exception as e:
+            error_message = f"I apologize, but I'm having trouble processing your request. Please try again later. Error: {str(e)}"
+            chunks.append(error_message)
+            yield {"event": "token", "data": {"content": error_message}}
+    finally:
+        # Shielded so a client disconnect (task cancellation) doesn't lose the turn or a partial reply
+        with anyio.CancelScope(shield=True):
+            messages = [user_message]
+            if chunks:
+                assistant_message = build_chat_message(
+                    ChatMessageCreate(content="".join(chunks), role="assistant"), user_id, message_id
+                )
+                messages.append(assistant_message)
+            async with session_scope() as write_db:
+                await run_db(write_db, save_chat_messages, messages)
+    
+    yield {
+        "event": "done",
+        "data": {
+            "message_id": message_id,
+            "timestamp": assistant_message.timestamp if assistant_message else None
+        }
     }
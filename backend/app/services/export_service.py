@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List
+from sqlalchemy import Boolean, DateTime, Float, Integer, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import iterate_in_threadpool
+from app.db.session import DBSession, session_scope
+from app.models.chat import ChatMessage
+from app.models.plan import Plan
+from app.models.progress import Progress
+
+# Dataset name -> (model, ordering columns)
+EXPORT_DATASETS = {
+    "progress": (Progress, ("date", "id")),
+    "chat": (ChatMessage, ("timestamp", "id")),
+    "plans": (Plan, ("created_at", "id")),
+}
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Rows fetched per round trip from the server-side cursor, and per Parquet row group
+EXPORT_BATCH_SIZE = 1000
+
+Batch = List[Dict[str, Any]]
+
+class ExportError(ValueError):
+    """
+    Raised for an unknown dataset or format, or a format whose optional dependency is missing
+    """
+
+def get_export_columns(dataset: str) -> List[Any]:
+    model, _ = EXPORT_DATASETS[dataset]
+    return list(model.__table__.columns)
+
+def build_export_query(dataset: str, user_id: int):
+    """
+    Select a user's rows of a dataset oldest first, streamed from a server-side cursor in batches
+    """
+    model, order_by = EXPORT_DATASETS[dataset]
+    return select(*get_export_columns(dataset)).where(
+        model.user_id == user_id
+    ).order_by(
+        *(getattr(model, column) for column in order_by)
+    ).execution_options(yield_per=EXPORT_BATCH_SIZE)
+
+def iter_export_batches(db: Session, dataset: str, user_id: int) -> Iterator[Batch]:
+    """
+    Yield a user's rows as plain dicts, one batch at a time, without building ORM objects
+    """
+    result = db.execute(build_export_query(dataset, user_id))
+    for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+async def aiter_export_batches(db: DBSession, dataset: str, user_id: int) -> AsyncIterator[Batch]:
+    """
+    Async counterpart of iter_export_batches; sync sessions fetch each batch in the threadpool
+    """
+    if isinstance(db, AsyncSession):
+        result = await db.stream(build_export_query(dataset, user_id))
+        async for partition in result.mappings().partitions():
+            yield [dict(row) for row in partition]
+    else:
+        async for batch in iterate_in_threadpool(iter_export_batches(db, dataset, user_id)):
+            yield batch
+
+def to_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+class NdjsonEncoder:
+    """
+    One JSON object per line; JSON columns stay nested
+    """
+    def __init__(self, columns: List[Any]):
+        self.columns = columns
+
+    def begin(self) -> bytes:
+        return b""
+
+    def encode(self, batch: Batch) -> bytes:
+        return "".join(json.dumps(row, default=to_text) + "\n" for row in batch).encode()
+
+    def end(self) -> bytes:
+        return b""
+
+class CsvEncoder:
+    """
+    CSV with one column per table column; JSON columns are written as JSON text
+    """
+    def __init__(self, columns: List[Any]):
+        self.names = [column.name for column in columns]
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer)
+
+    def drain(self) -> bytes:
+        data = self.buffer.getvalue().encode()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    def begin(self) -> bytes:
+        self.writer.writerow(self.names)
+        return self.drain()
+
+    def encode(self, batch: Batch) -> bytes:
+        self.writer.writerows([to_text(row[name]) for name in self.names] for row in batch)
+        return self.drain()
+
+    def end(self) -> bytes:
+        return b""
+
+class ParquetSink(io.RawIOBase):
+    """
+    Write-only file that hands written bytes back to the caller, so Parquet can be streamed
+    """
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+class ParquetEncoder:
+    """
+    Columnar Parquet output, one row group per batch; needs the optional pyarrow package
+    """
+    def __init__(self, columns: List[Any]):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ExportError("Parquet export requires the optional pyarrow package")
+        self.pa = pyarrow
+        self.names = [column.name for column in columns]
+        self.schema = pyarrow.schema([(column.name, self.arrow_type(column)) for column in columns])
+        self.sink = ParquetSink()
+        self.writer = pyarrow.parquet.ParquetWriter(self.sink, self.schema)
+
+    def arrow_type(self, column):
+        if isinstance(column.type, Boolean):
+            return self.pa.bool_()
+        if isinstance(column.type, Integer):
+            return self.pa.int64()
+        if isinstance(column.type, Float):
+            return self.pa.float64()
+        if isinstance(column.type, DateTime):
+            return self.pa.timestamp("us", tz="UTC")
+        return self.pa.string()
+
+    def begin(self) -> bytes:
+        return self.sink.drain()
+
+    def encode(self, batch: Batch) -> bytes:
+        if batch:
+            arrays = {
+                name: [
+                    json.dumps(row[name]) if isinstance(row[name], (dict, list)) else row[name]
+                    for row in batch
+                ]
+                for name in self.names
+            }
+            self.writer.write_table(self.pa.Table.from_pydict(arrays, schema=self.schema))
+        return self.sink.drain()
+
+    def end(self) -> bytes:
+        self.writer.close()
+        return self.sink.drain()
+
+EXPORT_ENCODERS = {"ndjson": NdjsonEncoder, "csv": CsvEncoder, "parquet": ParquetEncoder}
+
+def get_export_encoder(dataset: str, export_format: str):
+    """
+    Validate a dataset and format and create the encoder for them
+    """
+    if dataset not in EXPORT_DATASETS:
+        raise ExportError(f"Unknown dataset. Must be one of: {', '.join(EXPORT_DATASETS)}")
+    if export_format not in EXPORT_FORMATS:
+        raise ExportError(f"Unsupported format. Must be one of: {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_ENCODERS[export_format](get_export_columns(dataset))
+
+def encode_export(encoder, batches: Iterable[Batch]) -> Iterator[bytes]:
+    yield encoder.begin()
+    for batch in batches:
+        yield encoder.encode(batch)
+    yield encoder.end()
+
+def export_user_data(db: Session, user_id: int, dataset: str, export_format: str) -> Iterator[bytes]:
+    """
+    Encode a user's dataset chunk by chunk for a file or pipe; memory stays at one batch
+    """
+    encoder = get_export_encoder(dataset, export_format)
+    return encode_export(encoder, iter_export_batches(db, dataset, user_id))
+
+async def stream_user_data(encoder, user_id: int, dataset: str) -> AsyncIterator[bytes]:
+    """
+    Stream an encoded export for a response body, holding its own session for the whole stream
+    The encoder comes from get_export_encoder, so bad requests fail before the response starts
+    """
+    yield encoder.begin()
+    async with session_scope() as db:
+        async for batch in aiter_export_batches(db, dataset, user_id):
+            yield encoder.encode(batch)
+    yield encoder.end()
@@ -0,0 +1,268 @@
+import itertools
+import numpy as np
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from app.models.progress import Progress
+from app.services.cache_service import cache_forecast_model, get_cached_forecast_model, get_forecast_generation
+from app.services.progress_service import get_metric_column
+
+FORECAST_METRICS = ["weight", "body_fat"]
+HISTORY_DAYS = 180
+MIN_POINTS = 5
+MIN_SPAN_DAYS = 7
+MAX_HORIZON_DAYS = 730
+PROJECTION_STEP_DAYS = 7
+MAX_PROJECTION_DAYS = 182
+
+# Two-sided 80% interval
+CONFIDENCE = 0.8
+Z_SCORE = 1.2816
+
+# Smoothing parameter grid for the damped trend model, fitted all at once
+ALPHAS = (0.1, 0.2, 0.3, 0.5)
+BETA_RATIOS = (0.05, 0.1, 0.3)
+PHIS = (0.8, 0.9, 0.95, 0.98)
+
+class ForecastError(ValueError):
+    """
+    Raised when a forecast cannot be produced, with a user-facing message
+    """
+
+def load_metric_history(db: Session, user_id: int, metric: str, days: int = HISTORY_DAYS) -> List[Tuple[datetime, float]]:
+    """
+    Get a user's (date, value) observations of a metric over the last `days` days, oldest first
+    """
+    value = get_metric_column(metric)
+    start_date = datetime.utcnow() - timedelta(days=days)
+    rows = db.query(Progress.date, value).filter(
+        Progress.user_id == user_id,
+        Progress.date >= start_date,
+        value.isnot(None)
+    ).order_by(Progress.date, Progress.id).all()
+    return [(row[0], float(row[1])) for row in rows]
+
+def theil_sen(t: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    """
+    Robust line fit: the median of pairwise slopes, and the median intercept for that slope
+    """
+    i, j = np.triu_indices(len(t), k=1)
+    dt = t[j] - t[i]
+    valid = dt > 0
+    slope = float(np.median((y[j] - y[i])[valid] / dt[valid]))
+    intercept = float(np.median(y - slope * t))
+    return slope, intercept
+
+def robust_sigma(residuals: np.ndarray) -> float:
+    """
+    Residual standard deviation estimated from the MAD, falling back to the sample std
+    """
+    sigma = 1.4826 * float(np.median(np.abs(residuals - np.median(residuals))))
+    return sigma if sigma > 0 else float(np.std(residuals))
+
+def daily_series(t: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """
+    Resample irregular observations to one value per day: daily means, gaps linearly interpolated
+    """
+    days = np.floor(t).astype(int)
+    counts = np.bincount(days)
+    sums = np.bincount(days, weights=y)
+    observed = np.flatnonzero(counts)
+    return np.interp(np.arange(days[-1] + 1), observed, sums[observed] / counts[observed])
+
+def fit_damped_trend(series: np.ndarray) -> Dict[str, float]:
+    """
+    Fit additive damped-trend exponential smoothing (ETS(A,Ad,N)) by grid search on one-step errors
+    Every parameter combination runs in the same pass as a vector
+    """
+    grid = np.array([
+        (alpha, alpha * ratio, phi)
+        for alpha, ratio, phi in itertools.product(ALPHAS, BETA_RATIOS, PHIS)
+    ])
+    alpha, beta, phi = grid[:, 0], grid[:, 1], grid[:, 2]
+    level = np.full(len(grid), series[0])
+    trend = np.full(len(grid), float(np.mean(np.diff(series[:8]))) if len(series) > 1 else 0.0)
+    sse = np.zeros(len(grid))
+    for value in series[1:]:
+        error = value - (level + phi * trend)
+        sse += error ** 2
+        level = level + phi * trend + alpha * error
+        trend = phi * trend + beta * error
+
+    best = int(np.argmin(sse))
+    return {
+        "alpha": float(alpha[best]),
+        "beta": float(beta[best]),
+        "phi": float(phi[best]),
+        "level": float(level[best]),
+        "trend": float(trend[best]),
+        "sigma": float(np.sqrt(sse[best] / max(len(series) - 1, 1)))
+    }
+
+def fit_forecast_model(history: List[Tuple[datetime, float]]) -> Dict[str, Any]:
+    """
+    Fit the robust linear and damped trend models to a metric history
+    The result is JSON-serializable so it can be cached by any cache backend
+    """
+    origin = history[0][0]
+    t = np.array([(observed - origin).total_seconds() / 86400.0 for observed, _ in history])
+    y = np.array([value for _, value in history])
+    if len(y) < MIN_POINTS or t[-1] - t[0] < MIN_SPAN_DAYS:
+        raise ForecastError(
+            f"At least {MIN_POINTS} entries spanning {MIN_SPAN_DAYS} days are needed for a forecast"
+        )
+
+    slope, intercept = theil_sen(t, y)
+    return {
+        "last_date": history[-1][0].date().isoformat(),
+        "last_value": float(y[-1]),
+        "points": int(len(y)),
+        "linear": {
+            "slope": slope,
+            "intercept": intercept,
+            "sigma": robust_sigma(y - (slope * t + intercept)),
+            "t_last": float(t[-1]),
+            "t_mean": float(t.mean()),
+            "sxx": float(np.sum((t - t.mean()) ** 2))
+        },
+        "damped": fit_damped_trend(daily_series(t, y))
+    }
+
+def project_linear(model: Dict[str, Any], horizon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Robust linear projection `horizon` days past the last observation, with prediction half-widths
+    """
+    linear = model["linear"]
+    t = linear["t_last"] + horizon
+    mean = linear["intercept"] + linear["slope"] * t
+    spread = np.sqrt(1 + 1 / model["points"] + (t - linear["t_mean"]) ** 2 / linear["sxx"])
+    return mean, Z_SCORE * linear["sigma"] * spread
+
+def project_damped(model: Dict[str, Any], horizon: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Damped trend projection `horizon` days past the last observation, with prediction half-widths
+    """
+    damped = model["damped"]
+    phi = damped["phi"]
+    # phi_h = phi + phi^2 + ... + phi^h
+    phi_h = phi * (1 - phi ** horizon) / (1 - phi)
+    mean = damped["level"] + phi_h * damped["trend"]
+    # ETS(A,Ad,N) variance: sigma^2 * (1 + sum_{j=1}^{h-1} (alpha + beta * phi_j)^2)
+    j = np.arange(1, MAX_HORIZON_DAYS + 1)
+    c = (damped["alpha"] + damped["beta"] * phi * (1 - phi ** j) / (1 - phi)) ** 2
+    cumulative = np.concatenate([[0.0, 0.0], np.cumsum(c)])
+    variance = damped["sigma"] ** 2 * (1 + cumulative[horizon.astype(int)])
+    return mean, Z_SCORE * np.sqrt(variance)
+
+def first_crossing(values: np.ndarray, target: float, direction: float) -> Optional[int]:
+    """
+    First index at which values reach target moving in `direction`, or None if they never do
+    """
+    reached = (values - target) * direction >= 0
+    return int(np.argmax(reached)) if reached.any() else None
+
+def model_eta(mean: np.ndarray, half_width: np.ndarray, target: float, direction: float, last_date: date) -> Dict[str, Any]:
+    """
+    Projected date the target is reached, with the range implied by the prediction band
+    """
+    def to_date(day: Optional[int]) -> Optional[date]:
+        return last_date + timedelta(days=day) if day is not None else None
+
+    eta = first_crossing(mean, target, direction)
+    return {
+        "reachable": eta is not None,
+        "eta": to_date(eta),
+        "eta_range": {
+            "earliest": to_date(first_crossing(mean + direction * half_width, target, direction)),
+            "latest": to_date(first_crossing(mean - direction * half_width, target, direction))
+        }
+    }
+
+def forecast_target(model: Dict[str, Any], metric: str, target: float, target_date: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Forecast when a fitted metric reaches `target`, and compare the required and observed weekly rates
+    """
+    last_date = date.fromisoformat(model["last_date"])
+    current = model["damped"]["level"]
+    direction = float(np.sign(target - current))
+    observed_weekly_rate = model["linear"]["slope"] * 7
+
+    horizon = np.arange(MAX_HORIZON_DAYS + 1, dtype=float)
+    linear_mean, linear_width = project_linear(model, horizon)
+    damped_mean, damped_width = project_damped(model, horizon)
+
+    result: Dict[str, Any] = {
+        "metric": metric,
+        "target": target,
+        "current": current,
+        "last_observed": {"date": last_date, "value": model["last_value"]},
+        "points": model["points"],
+        "confidence": CONFIDENCE,
+        "observed_weekly_rate": observed_weekly_rate,
+        "target_date": target_date,
+        "required_weekly_rate": None,
+        "on_track": None
+    }
+
+    if direction == 0:
+        reached = {"reachable": True, "eta": last_date, "eta_range": {"earliest": last_date, "latest": last_date}}
+        result["models"] = {"robust_linear": dict(reached), "damped_trend": dict(reached)}
+    else:
+        result["models"] = {
+            "robust_linear": model_eta(linear_mean, linear_width, target, direction, last_date),
+            "damped_trend": model_eta(damped_mean, damped_width, target, direction, last_date)
+        }
+        phi = model["damped"]["phi"]
+        result["models"]["damped_trend"]["asymptote"] = current + model["damped"]["trend"] * phi / (1 - phi)
+
+    result["models"]["robust_linear"]["weekly_rate"] = observed_weekly_rate
+    result["models"]["damped_trend"]["weekly_rate"] = model["damped"]["trend"] * 7
+
+    if target_date is not None:
+        weeks = (target_date - last_date).days / 7
+        if weeks > 0:
+            result["required_weekly_rate"] = (target - current) / weeks
+            result["on_track"] = bool(
+                direction == 0
+                or (observed_weekly_rate * direction > 0
+                    and abs(observed_weekly_rate) >= abs(result["required_weekly_rate"]))
+            )
+
+    steps = np.arange(0, MAX_PROJECTION_DAYS + 1, PROJECTION_STEP_DAYS)
+    result["projection"] = [
+        {
+            "date": last_date + timedelta(days=int(day)),
+            "linear": float(linear_mean[day]),
+            "linear_lower": float(linear_mean[day] - linear_width[day]),
+            "linear_upper": float(linear_mean[day] + linear_width[day]),
+            "damped": float(damped_mean[day]),
+            "damped_lower": float(damped_mean[day] - damped_width[day]),
+            "damped_upper": float(damped_mean[day] + damped_width[day])
+        }
+        for day in steps
+    ]
+    return result
+
+def get_forecast_model(db: Session, user_id: int, metric: str) -> Dict[str, Any]:
+    """
+    Get a user's fitted forecast model for a metric, fitting and caching it on a miss
+    Cached models are dropped whenever the user's progress changes
+    """
+    model = get_cached_forecast_model(user_id, metric)
+    if model is None:
+        generation = get_forecast_generation(user_id)
+        history = load_metric_history(db, user_id, metric)
+        if not history:
+            raise ForecastError(f"No {metric} entries to forecast from")
+        model = fit_forecast_model(history)
+        cache_forecast_model(user_id, metric, model, generation)
+    return model
+
+def get_goal_forecast(db: Session, user_id: int, metric: str, target: float, target_date: Optional[date] = None) -> Dict[str, Any]:
+    """
+    Forecast when a user's weight or body fat reaches a target value
+    """
+    if metric not in FORECAST_METRICS:
+        raise ForecastError(f"Forecasts are available for: {', '.join(FORECAST_METRICS)}")
+    model = get_forecast_model(db, user_id, metric)
+    return forecast_target(model, metric, target, target_date)
@@ -0,0 +1,175 @@
+import asyncio
+import enum
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from uuid import uuid4
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class JobError(Exception):
+    """
+    Raised by a job function to fail the job with a user-facing message
+    """
+
+class JobQueueFull(Exception):
+    """
+    Raised by enqueue when the queue is full or the user already has too many unfinished jobs
+    """
+
+@dataclass
+class Job:
+    id: str
+    user_id: int
+    kind: str
+    func: Callable[..., Awaitable[Dict[str, Any]]] = field(repr=False)
+    args: tuple = field(default=(), repr=False)
+    kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    status: JobStatus = JobStatus.PENDING
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+class JobQueue:
+    """
+    In-process job queue drained by a fixed pool of asyncio workers
+    Jobs own their database sessions, so no request or connection is held while they run
+
+    Job state lives only in this process: with several server workers, a job can only be
+    polled on the worker that enqueued it.
+    """
+    def __init__(self, workers: int, history_size: int, max_size: int, max_pending_per_user: int):
+        self.worker_count = workers
+        self.history_size = history_size
+        self.max_size = max_size
+        self.max_pending_per_user = max_pending_per_user
+        self._queue: Optional[asyncio.Queue] = None
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"job-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def enqueue(self, user_id: int, kind: str, func: Callable[..., Awaitable[Dict[str, Any]]], /, *args: Any, **kwargs: Any) -> Job:
+        """
+        Queue a coroutine function to run in the background and return its job
+        Raises JobQueueFull when the queue is full or the user has too many unfinished jobs
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        unfinished = sum(1 for job in self._jobs.values() if job.user_id == user_id and not job.finished)
+        if unfinished >= self.max_pending_per_user:
+            raise JobQueueFull(f"Too many unfinished jobs (limit {self.max_pending_per_user}); wait for one to finish")
+        job = Job(id=str(uuid4()), user_id=user_id, kind=kind, func=func, args=args, kwargs=kwargs)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise JobQueueFull("Too many jobs are queued; try again later")
+        self._jobs[job.id] = job
+        self._prune()
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """
+        Wait up to `timeout` seconds for a job to finish and return it in its current state
+        """
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        return job
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once the history is full
+        if len(self._jobs) <= self.history_size:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished]:
+            del self._jobs[job_id]
+            if len(self._jobs) <= self.history_size:
+                break
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now(timezone.utc)
+            try:
+                job.result = await job.func(*job.args, **job.kwargs)
+                job.status = JobStatus.SUCCEEDED
+            except JobError as e:
+                job.error = str(e)
+                job.status = JobStatus.FAILED
+            except asyncio.CancelledError:
+                # The queue is stopping; don't leave the job reported as running
+                job.error = "Job was cancelled"
+                job.status = JobStatus.FAILED
+                raise
+            except Exception as e:
+                logger.exception("Job %s (%s) failed", job.id, job.kind)
+                job.error = f"Unexpected error: {str(e)}"
+                job.status = JobStatus.FAILED
+            finally:
+                job.finished_at = datetime.now(timezone.utc)
+                job.func, job.args, job.kwargs = None, (), {}
+                job.done.set()
+                self._queue.task_done()
+
+def serialize_job(job: Job) -> Dict[str, Any]:
+    """
+    Convert a job into the shape of the JobResponse schema
+    """
+    return {
+        "job_id": job.id,
+        "kind": job.kind,
+        "status": job.status.value,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+        "result": job.result,
+        "error": job.error
+    }
+
+job_queue = JobQueue(
+    workers=settings.JOB_WORKERS,
+    history_size=settings.JOB_HISTORY_SIZE,
+    max_size=settings.JOB_QUEUE_MAX_SIZE,
+    max_pending_per_user=settings.JOB_MAX_PENDING_PER_USER
+)
+
+def get_job_queue() -> JobQueue:
+    """
+    Returns the application's job queue instance
+    """
+    return job_queue
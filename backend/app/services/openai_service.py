@@ -1,58 +1,157 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
+import asyncio
+import hashlib
+import httpx
+import json
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from app.core.config import settings
 from app.models.profile import UserProfile
 from app.models.plan import Plan
+from app.utils.metrics import record_llm_usage, track_llm_call
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client: Optional[AsyncOpenAI] = None
 
-def get_openai_client() -> OpenAI:
+# Completion requests currently in flight, keyed by request fingerprint
+_inflight: Dict[str, "asyncio.Task"] = {}
+
+def create_openai_client() -> AsyncOpenAI:
+    """
+    Build an AsyncOpenAI client backed by a pooled, keep-alive HTTP connection set
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT),
+    )
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        http_client=http_client,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+    )
+
+def init_openai_client() -> AsyncOpenAI:
     """
-    Returns the OpenAI client instance
+    Create the shared OpenAI client (called from the app lifespan hook)
     """
+    global client
+    if client is None:
+        client = create_openai_client()
     return client
 
-def generate_ai_response(message: str, user_profile: Optional[UserProfile] = None) -> dict:
+async def close_openai_client() -> None:
     """
-    Generate a response from the AI coach using OpenAI's GPT model
+    Close the shared OpenAI client and its HTTP connection pool
     """
-    try:
-        system_message = """
-        You are an AI fitness coach assistant. Your role is to help users with:
-        1. Creating personalized workout plans based on their goals, fitness level, and preferences
-        2. Designing diet plans that align with their nutritional needs and goals
-        3. Providing fitness advice and answering exercise-related questions
-        4. Motivating users and helping them stay on track with their fitness journey
+    global client
+    if client is not None:
+        await client.close()
+        client = None
+
+def get_openai_client() -> AsyncOpenAI:
+    """
+    Returns the shared AsyncOpenAI client instance, creating it on first use
+    """
+    return client if client is not None else init_openai_client()
+
+def request_fingerprint(params: Dict[str, Any]) -> str:
+    """
+    Fingerprint a completion request by its model, messages and sampling parameters
+    """
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def _forget_inflight(key: str, task: "asyncio.Task") -> None:
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        # Mark the exception as retrieved even if every waiter went away
+        task.exception()
+
+async def _tracked_completion(call_site: str, params: Dict[str, Any]) -> Any:
+    async with track_llm_call(call_site):
+        response = await get_openai_client().chat.completions.create(**params)
+    record_llm_usage(call_site, getattr(response, "usage", None))
+    return response
+
+async def create_chat_completion(call_site: str = "other", **params: Any) -> Any:
+    """
+    Create a chat completion, coalescing concurrent identical requests into a single upstream call
+    Duplicates await the outstanding call; a waiter being cancelled does not cancel it for the others
+    Upstream calls are recorded in the LLM metrics under `call_site`
+    """
+    key = request_fingerprint(params)
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_tracked_completion(call_site, params))
+        _inflight[key] = task
+        task.add_done_callback(lambda done: _forget_inflight(key, done))
+    return await asyncio.shield(task)
+
+def build_chat_messages(
+    message: str,
+    user_profile: Optional[UserProfile] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Build the messages sent to the AI coach for a chat turn: the system prompt,
+    the rolling summary of older turns, the recent turns verbatim and the new message
+    """
+    system_message = """
+    You are an AI fitness coach assistant. Your role is to help users with:
+    1. Creating personalized workout plans based on their goals, fitness level, and preferences
+    2. Designing diet plans that align with their nutritional needs and goals
+    3. Providing fitness advice and answering exercise-related questions
+    4. Motivating users and helping them stay on track with their fitness journey
+    
+    Be supportive, knowledgeable, and provide detailed, actionable advice.
+    """
+    
+    if user_profile:
+        profile_info = f"""
+        User Profile Information:
+        - Height: {user_profile.height or 'Not specified'} cm
+        - Weight: {user_profile.weight or 'Not specified'} kg
+        - Age: {user_profile.age or 'Not specified'} years
+        - Fitness Level: {user_profile.fitness_level or 'Not specified'}
+        - Fitness Goal: {user_profile.fitness_goal or 'Not specified'}
+        - Dietary Preferences: {user_profile.dietary_preferences or 'Not specified'}
+        - Workout Preferences: {user_profile.workout_preferences or 'Not specified'}
+        - Available Equipment: {user_profile.available_equipment or 'Not specified'}
+        - Health Conditions: {user_profile.health_conditions or 'Not specified'}
         
-        Be supportive, knowledgeable, and provide detailed, actionable advice.
+        Use this information to provide highly personalized advice and plans tailored to the user's specific needs and circumstances.
         """
         
-        if user_profile:
-            profile_info = f"""
-            User Profile Information:
-            - Height: {user_profile.height or 'Not specified'} cm
-            - Weight: {user_profile.weight or 'Not specified'} kg
-            - Age: {user_profile.age or 'Not specified'} years
-            - Fitness Level: {user_profile.fitness_level or 'Not specified'}
-            - Fitness Goal: {user_profile.fitness_goal or 'Not specified'}
-            - Dietary Preferences: {user_profile.dietary_preferences or 'Not specified'}
-            - Workout Preferences: {user_profile.workout_preferences or 'Not specified'}
-            - Available Equipment: {user_profile.available_equipment or 'Not specified'}
-            - Health Conditions: {user_profile.health_conditions or 'Not specified'}
-            
-            Use this information to provide highly personalized advice and plans tailored to the user's specific needs and circumstances.
-            """
-            
-            system_message += "\n\n" + profile_info
-        
-        response = client.chat.completions.create(
+        system_message += "\n\n" + profile_info
+    
+    messages = [{"role": "system", "content": system_message}]
+    
+    if summary:
+        messages.append({"role": "system", "content": f"Summary of the earlier conversation with this user:\n{summary}"})
+    
+    messages.extend(history or [])
+    messages.append({"role": "user", "content": message})
+    return messages
+
+async def generate_ai_response(
+    message: str,
+    user_profile: Optional[UserProfile] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
+) -> dict:
+    """
+    Generate a response from the AI coach using OpenAI's GPT model
+    """
+    try:
+        response = await create_chat_completion(
+            call_site="generate_ai_response",
             model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": message}
-            ],
+            messages=build_chat_messages(message, user_profile, history=history, summary=summary),
             max_tokens=1000,
             temperature=0.7
         )
@@ -75,7 +174,61 @@ def generate_ai_response(message: str, user_profile: Optional[UserProfile] = Non
             "timestamp": datetime.utcnow()
         }
 
-def analyze_plan(plan: Plan, user_profile: Optional[UserProfile] = None) -> dict:
+def stream_ai_response(
+    message: str,
+    user_profile: Optional[UserProfile] = None,
+    history: Optional[List[Dict[str, str]]] = None,
+    summary: Optional[str] = None
+) -> AsyncIterator[str]:
+    """
+    Stream the AI coach's response as content deltas while they are generated
+    The prompt is built eagerly so the profile is read before the caller releases its session
+    """
+    messages = build_chat_messages(message, user_profile, history=history, summary=summary)
+    
+    async def token_stream() -> AsyncIterator[str]:
+        async with track_llm_call("stream_ai_response"):
+            stream = await get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=messages,
+                max_tokens=1000,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            async for chunk in stream:
+                # The final chunk carries the usage and no choices
+                record_llm_usage("stream_ai_response", getattr(chunk, "usage", None))
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+    
+    return token_stream()
+
+async def summarize_conversation(previous_summary: Optional[str], messages: List[Dict[str, str]]) -> str:
+    """
+    Fold new chat messages into the rolling conversation summary
+    Raises on API errors so the caller keeps the previous summary
+    """
+    transcript = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    
+    response = await create_chat_completion(
+        call_site="summarize_conversation",
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": """You maintain the memory of an AI fitness coach.
+            Update the running summary of the conversation with the new messages.
+            Keep facts the coach needs later: the user's goals, constraints, injuries, preferences,
+            plans or advice already given, and open questions. Drop small talk.
+            Reply with the updated summary only, in at most 200 words."""},
+            {"role": "user", "content": f"Current summary:\n{previous_summary or '(none)'}\n\nNew messages:\n{transcript}"}
+        ],
+        max_tokens=settings.CHAT_SUMMARY_MAX_TOKENS,
+        temperature=0.2
+    )
+    
+    return response.choices[0].message.content.strip()
+
+async def analyze_plan(plan: Plan, user_profile: Optional[UserProfile] = None) -> dict:
     """
     Analyze a workout or diet plan and provide feedback based on user profile data
     """
@@ -123,7 +276,8 @@ def analyze_plan(plan: Plan, user_profile: Optional[UserProfile] = None) -> dict
         {plan.content}
         """
         
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
+            call_site="analyze_plan",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": system_message},
@@ -142,7 +296,8 @@ def analyze_plan(plan: Plan, user_profile: Optional[UserProfile] = None) -> dict
             "analysis_id": analysis_id,
             "plan_id": plan.id,
             "analysis": analysis,
-            "timestamp": timestamp
+            "timestamp": timestamp,
+            "success": True
         }
         
     except Exception as e:
@@ -150,5 +305,6 @@ def analyze_plan(plan: Plan, user_profile: Optional[UserProfile] = None) -> dict
             "analysis_id": str(uuid.uuid4()),
             "plan_id": plan.id if plan else None,
             "analysis": f"I apologize, but I'm having trouble analyzing this plan. Please try again later. Error: {str(e)}",
-            "timestamp": datetime.utcnow()
+            "timestamp": datetime.utcnow(),
+            "success": False
         }
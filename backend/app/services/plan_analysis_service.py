@@ -0,0 +1,134 @@
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import Optional, Dict, Any
+from datetime import datetime, timezone
+import hashlib
+import json
+from app.db.session import DBSession, release_db, run_db
+from app.models.plan import Plan
+from app.models.plan_analysis import PlanAnalysis
+from app.models.profile import UserProfile
+from app.services.openai_service import analyze_plan
+
+PROFILE_FINGERPRINT_FIELDS = [
+    "height",
+    "weight",
+    "age",
+    "fitness_level",
+    "fitness_goal",
+    "dietary_preferences",
+    "workout_preferences",
+    "available_equipment",
+    "health_conditions",
+]
+
+def compute_plan_content_hash(plan: Plan) -> str:
+    """
+    Hash the parts of a plan that are sent to the AI for analysis
+    """
+    return hashlib.sha256(f"{plan.type}\n{plan.content}".encode("utf-8")).hexdigest()
+
+def compute_profile_fingerprint(user_profile: Optional[UserProfile]) -> str:
+    """
+    Fingerprint the profile fields that are sent to the AI for analysis
+    """
+    profile_data = {
+        field: getattr(user_profile, field, None) if user_profile else None
+        for field in PROFILE_FINGERPRINT_FIELDS
+    }
+    return hashlib.sha256(json.dumps(profile_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+def get_stored_plan_analysis(db: Session, plan_id: int, content_hash: str, profile_fingerprint: str) -> Optional[PlanAnalysis]:
+    """
+    Get the stored analysis for a plan generated from the given inputs
+    """
+    return db.query(PlanAnalysis).filter(
+        PlanAnalysis.plan_id == plan_id,
+        PlanAnalysis.content_hash == content_hash,
+        PlanAnalysis.profile_fingerprint == profile_fingerprint
+    ).first()
+
+def save_plan_analysis(
+    db: Session,
+    plan_id: int,
+    user_id: int,
+    content_hash: str,
+    profile_fingerprint: str,
+    analysis: str
+) -> PlanAnalysis:
+    """
+    Store an analysis for a plan, replacing analyses made from older inputs
+    """
+    db.query(PlanAnalysis).filter(
+        PlanAnalysis.plan_id == plan_id,
+        (PlanAnalysis.content_hash != content_hash) | (PlanAnalysis.profile_fingerprint != profile_fingerprint)
+    ).delete(synchronize_session=False)
+
+    db_analysis = get_stored_plan_analysis(db, plan_id, content_hash, profile_fingerprint)
+    if db_analysis is None:
+        db_analysis = PlanAnalysis(
+            plan_id=plan_id,
+            user_id=user_id,
+            content_hash=content_hash,
+            profile_fingerprint=profile_fingerprint
+        )
+        db.add(db_analysis)
+    db_analysis.analysis = analysis
+    db_analysis.created_at = datetime.now(timezone.utc)
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent request stored the same analysis first
+        db.rollback()
+        db_analysis = get_stored_plan_analysis(db, plan_id, content_hash, profile_fingerprint)
+        db_analysis.analysis = analysis
+        db.commit()
+
+    db.refresh(db_analysis)
+    return db_analysis
+
+def _analysis_response(db_analysis: PlanAnalysis, cached: bool) -> Dict[str, Any]:
+    return {
+        "analysis_id": db_analysis.id,
+        "plan_id": db_analysis.plan_id,
+        "analysis": db_analysis.analysis,
+        "timestamp": db_analysis.created_at,
+        "cached": cached
+    }
+
+async def get_or_create_plan_analysis(
+    db: DBSession,
+    plan: Plan,
+    user_profile: Optional[UserProfile] = None,
+    refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Return the stored analysis for the plan's current content and the user's current profile,
+    calling the AI only when those inputs changed or a refresh is requested
+    The session's connection is released while the AI call runs
+    """
+    content_hash = compute_plan_content_hash(plan)
+    profile_fingerprint = compute_profile_fingerprint(user_profile)
+
+    if not refresh:
+        db_analysis = await run_db(db, get_stored_plan_analysis, plan.id, content_hash, profile_fingerprint)
+        if db_analysis:
+            return _analysis_response(db_analysis, cached=True)
+
+    await release_db(db)
+    analysis_result = await analyze_plan(plan=plan, user_profile=user_profile)
+
+    if not analysis_result.get("success"):
+        return analysis_result
+
+    db_analysis = await run_db(
+        db,
+        save_plan_analysis,
+        plan.id,
+        plan.user_id,
+        content_hash,
+        profile_fingerprint,
+        analysis_result["analysis"]
+    )
+    return _analysis_response(db_analysis, cached=False)
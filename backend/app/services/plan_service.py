@@ -2,8 +2,10 @@ from sqlalchemy.orm import Session
 from app.models.plan import Plan
 from app.models.chat import ChatMessage
 from app.schemas.plan import PlanCreate, PlanUpdate
-from typing import List, Optional, Dict, Any, Union
+from typing import List, Optional, Dict, Any, Tuple, Union
 from uuid import uuid4
+from app.services.cache_service import invalidate_progress_analysis
+from app.utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
 
 def create_plan(db: Session, plan: PlanCreate, user_id: int) -> Plan:
     """
@@ -16,14 +18,15 @@ def create_plan(db: Session, plan: PlanCreate, user_id: int) -> Plan:
     )
     db.add(db_plan)
     db.commit()
-    db.refresh(db_plan)
+    invalidate_progress_analysis(user_id)
     return db_plan
 
-def get_plans_by_user_id(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Plan]:
+def get_plans_by_user_id(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[Plan], Optional[str]]:
     """
-    Get all plans for a user
+    Get a page of a user's plans, newest first, and the cursor for the next page
     """
-    return db.query(Plan).filter(Plan.user_id == user_id).offset(skip).limit(limit).all()
+    query = db.query(Plan).filter(Plan.user_id == user_id)
+    return paginate_keyset(query, Plan.created_at, Plan.id, limit, cursor)
 
 def get_plan_by_id(db: Session, plan_id: int) -> Optional[Plan]:
     """
@@ -31,11 +34,12 @@ def get_plan_by_id(db: Session, plan_id: int) -> Optional[Plan]:
     """
     return db.query(Plan).filter(Plan.id == plan_id).first()
 
-def get_plans_by_type(db: Session, user_id: int, plan_type: str, skip: int = 0, limit: int = 100) -> List[Plan]:
+def get_plans_by_type(db: Session, user_id: int, plan_type: str, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[Plan], Optional[str]]:
     """
-    Get all plans of a specific type for a user
+    Get a page of a user's plans of a specific type, newest first, and the cursor for the next page
     """
-    return db.query(Plan).filter(Plan.user_id == user_id, Plan.type == plan_type).offset(skip).limit(limit).all()
+    query = db.query(Plan).filter(Plan.user_id == user_id, Plan.type == plan_type)
+    return paginate_keyset(query, Plan.created_at, Plan.id, limit, cursor)
 
 def delete_plan(db: Session, plan_id: int) -> Dict[str, Any]:
     """
@@ -47,6 +51,7 @@ def delete_plan(db: Session, plan_id: int) -> Dict[str, Any]:
     
     db.delete(plan)
     db.commit()
+    invalidate_progress_analysis(plan.user_id)
     return {"success": True, "message": "Plan deleted successfully"}
 
 def update_plan(db: Session, plan_id: int, plan_data: Union[PlanUpdate, Dict[str, Any]]) -> Optional[Plan]:
@@ -57,12 +62,12 @@ def update_plan(db: Session, plan_id: int, plan_data: Union[PlanUpdate, Dict[str
     if not plan:
         return None
     
-    for key, value in plan_data.dict() if hasattr(plan_data, 'dict') else plan_data.items():
+    for key, value in plan_data.dict().items() if hasattr(plan_data, 'dict') else plan_data.items():
         if value is not None:
             setattr(plan, key, value)
     
     db.commit()
-    db.refresh(plan)
+    invalidate_progress_analysis(plan.user_id)
     return plan
 
 def create_plan_from_message(db: Session, message: ChatMessage, user_id: str, plan_type: str) -> Plan:
@@ -77,5 +82,5 @@ def create_plan_from_message(db: Session, message: ChatMessage, user_id: str, pl
     
     db.add(db_plan)
     db.commit()
-    db.refresh(db_plan)
+    invalidate_progress_analysis(user_id)
     return db_plan
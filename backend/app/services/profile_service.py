@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from app.models.profile import UserProfile
 from app.schemas.profile import ProfileCreate, ProfileUpdate
 from typing import Optional, Dict, Any, Union, Tuple
+from app.services.cache_service import invalidate_progress_analysis
 
 def get_profile_by_user_id(db: Session, user_id: int) -> Optional[UserProfile]:
     """
@@ -27,7 +28,7 @@ def create_profile(db: Session, profile: ProfileCreate, user_id: int) -> UserPro
     )
     db.add(db_profile)
     db.commit()
-    db.refresh(db_profile)
+    invalidate_progress_analysis(user_id)
     return db_profile
 
 def update_profile(db: Session, user_id: int, profile_data: Union[ProfileUpdate, Dict[str, Any]]) -> Optional[UserProfile]:
@@ -49,7 +50,7 @@ def update_profile(db: Session, user_id: int, profile_data: Union[ProfileUpdate,
             setattr(db_profile, key, value)
     
     db.commit()
-    db.refresh(db_profile)
+    invalidate_progress_analysis(user_id)
     return db_profile
 
 def delete_profile(db: Session, user_id: int) -> Dict[str, Any]:
@@ -63,6 +64,7 @@ def delete_profile(db: Session, user_id: int) -> Dict[str, Any]:
     
     db.delete(db_profile)
     db.commit()
+    invalidate_progress_analysis(user_id)
     return {"success": True, "message": "Profile deleted successfully"}
 
 def get_or_create_profile(db: Session, user_id: int) -> Tuple[UserProfile, bool]:
@@ -91,5 +93,5 @@ def get_or_create_profile(db: Session, user_id: int) -> Tuple[UserProfile, bool]
     
     db.add(default_profile)
     db.commit()
-    db.refresh(default_profile)
+    invalidate_progress_analysis(user_id)
     return default_profile, True
@@ -2,17 +2,27 @@ from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 import json
-from app.utils.json_encoder import DateTimeEncoder
+from app.db.session import DBSession, release_db, run_db, session_scope
+from app.services.cache_service import get_cached_progress_analysis, get_progress_analysis_generation, cache_progress_analysis
+from app.utils.cache import run_cache
 
 from app.models.progress import Progress
 from app.models.profile import UserProfile
 from app.models.plan import Plan
-from app.services.progress_service import get_recent_progress, get_progress_trends
-from app.services.openai_service import get_openai_client
+from app.services.progress_service import get_recent_progress, build_metric_trends
+from app.services.progress_rollup_service import entry_metrics
+from app.services.progress_stats_service import compute_progress_stats, summarize_stats_for_prompt
+from app.services.openai_service import create_chat_completion
+from app.services.prompt_builder import build_budgeted_prompt_data, to_prompt_json
+from app.core.config import settings
+from app.services.plan_service import create_plan
+from app.services.job_service import JobError
+from app.schemas.plan import PlanCreate
 
-def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str, Any]:
+def build_progress_analysis_data(db: Session, user_id: int, days: int = 30) -> Optional[Dict[str, Any]]:
     """
-    Analyze user progress data using AI to provide insights and recommendations
+    Collect the profile, progress entries, recent plans and trends sent to the AI for analysis
+    Returns None when there are no progress entries in the window
     """
     user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     
@@ -21,20 +31,19 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
     active_plans = db.query(Plan).filter(Plan.user_id == user_id).order_by(Plan.created_at.desc()).limit(3).all()
     
     if not progress_entries:
-        return {
-            "success": False,
-            "message": "Not enough progress data for analysis. Please log more progress entries.",
-            "insights": [],
-            "recommendations": []
-        }
+        return None
     
+    # Trends and statistics come from the entries already loaded rather than another scan of the window
+    chronological_entries = list(reversed(progress_entries))
     metrics = ["weight", "body_fat"]
-    trends = {}
-    
-    for metric in metrics:
-        trend_data = get_progress_trends(db, user_id, metric, days)
-        if trend_data and trend_data.get("data"):
-            trends[metric] = trend_data
+    trends = {
+        metric: trend_data
+        for metric, trend_data in build_metric_trends(
+            ((entry.date, entry_metrics(entry)) for entry in chronological_entries), metrics, days
+        ).items()
+        if trend_data["data"]
+    }
+    stats = summarize_stats_for_prompt(compute_progress_stats(chronological_entries, days))
     
     # Convert UserProfile to dictionary manually
     user_profile_dict = {}
@@ -83,13 +92,38 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
                 "change": trend.get("change")
             }
             for metric, trend in trends.items()
-        }
+        },
+        "stats": stats
     }
     
-    client = get_openai_client()
+    return analysis_data
+
+async def analyze_progress_data(db: DBSession, user_id: int, days: int = 30) -> Dict[str, Any]:
+    """
+    Analyze user progress data using AI to provide insights and recommendations
+    Results are cached per user and window until the user's progress, profile or plans change
+    The data is read in one short transaction and no connection is held during the AI call
+    """
+    cached_analysis = await run_cache(get_cached_progress_analysis, user_id, days)
+    if cached_analysis is not None:
+        return cached_analysis
+    
+    # Read before the data, so a write during the AI call keeps the result out of the cache
+    generation = await run_cache(get_progress_analysis_generation, user_id)
+    analysis_data = await run_db(db, build_progress_analysis_data, user_id, days)
+    await release_db(db)
+    
+    if analysis_data is None:
+        return {
+            "success": False,
+            "message": "Not enough progress data for analysis. Please log more progress entries.",
+            "insights": [],
+            "recommendations": []
+        }
     
     try:
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
+            call_site="analyze_progress_data",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": """You are an AI fitness coach analyzing user progress data. 
@@ -100,6 +134,10 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
                 3. Alignment with user's fitness goals
                 4. Specific, actionable recommendations
                 
+                The "stats" field holds precomputed statistics (weekly slopes, moving averages,
+                week-over-week changes, plateaus, outlier counts and correlations); rely on them
+                rather than recomputing from the raw entries.
+                
                 Format your response as JSON with the following structure:
                 {
                     "analysis_summary": "Brief overall assessment of progress",
@@ -115,7 +153,7 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
                     }
                 }
                 """},
-                {"role": "user", "content": f"Here is my progress data for analysis: {json.dumps(analysis_data, cls=DateTimeEncoder)}"}
+                {"role": "user", "content": f"Here is my progress data for analysis: {to_prompt_json(build_budgeted_prompt_data(analysis_data, settings.PROGRESS_ANALYSIS_PROMPT_TOKENS))}"}
             ],
             temperature=0.7,
             max_tokens=1500
@@ -123,13 +161,16 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
         
         analysis_result = json.loads(response.choices[0].message.content)
         
-        return {
+        analysis = {
             "success": True,
             "analysis_summary": analysis_result.get("analysis_summary", ""),
             "insights": analysis_result.get("insights", []),
             "recommendations": analysis_result.get("recommendations", []),
             "plan_adjustments": analysis_result.get("plan_adjustments", {})
         }
+        await run_cache(cache_progress_analysis, user_id, days, analysis, generation)
+        
+        return analysis
         
     except Exception as e:
         print(f"Error in AI progress analysis: {str(e)}")
@@ -140,14 +181,14 @@ def analyze_progress_data(db: Session, user_id: int, days: int = 30) -> Dict[str
             "recommendations": []
         }
 
-def generate_adaptive_plan(
+def build_adaptive_plan_data(
     db: Session, 
     user_id: int, 
     plan_type: str, 
     original_plan_id: Optional[int] = None
 ) -> Dict[str, Any]:
     """
-    Generate an adaptive plan based on user's progress data and profile
+    Collect the profile, recent progress and original plan used to generate an adaptive plan
     """
     user_profile = db.query(UserProfile).filter(UserProfile.user_id == user_id).first()
     
@@ -196,10 +237,24 @@ def generate_adaptive_plan(
         "plan_type": plan_type
     }
     
-    client = get_openai_client()
+    return plan_data
+
+async def generate_adaptive_plan(
+    db: DBSession, 
+    user_id: int, 
+    plan_type: str, 
+    original_plan_id: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Generate an adaptive plan based on user's progress data and profile
+    No connection is held during the AI call
+    """
+    plan_data = await run_db(db, build_adaptive_plan_data, user_id, plan_type, original_plan_id)
+    await release_db(db)
     
     try:
-        response = client.chat.completions.create(
+        response = await create_chat_completion(
+            call_site="generate_adaptive_plan",
             model="gpt-3.5-turbo",
             messages=[
                 {"role": "system", "content": f"""You are an AI fitness coach creating an adaptive {plan_type} plan.
@@ -214,7 +269,7 @@ def generate_adaptive_plan(
                 
                 Format your response as a complete {plan_type} plan with clear sections and instructions.
                 """},
-                {"role": "user", "content": f"Here is my data for creating an adaptive {plan_type} plan: {json.dumps(plan_data, cls=DateTimeEncoder)}"}
+                {"role": "user", "content": f"Here is my data for creating an adaptive {plan_type} plan: {to_prompt_json(build_budgeted_prompt_data(plan_data, settings.ADAPTIVE_PLAN_PROMPT_TOKENS))}"}
             ],
             temperature=0.7,
             max_tokens=2000
@@ -236,3 +291,49 @@ def generate_adaptive_plan(
             "success": False,
             "message": f"Error generating adaptive plan: {str(e)}"
         }
+
+async def run_progress_analysis_job(user_id: int, days: int = 30) -> Dict[str, Any]:
+    """
+    Background job: analyze the user's progress data
+    """
+    async with session_scope() as db:
+        analysis_result = await analyze_progress_data(db, user_id=user_id, days=days)
+    
+    if not analysis_result["success"]:
+        raise JobError(analysis_result["message"])
+    
+    return analysis_result
+
+async def run_adaptive_plan_job(user_id: int, plan_type: str, original_plan_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Background job: generate an adaptive plan and save it as a new plan for the user
+    """
+    async with session_scope() as db:
+        plan_result = await generate_adaptive_plan(
+            db,
+            user_id=user_id,
+            plan_type=plan_type,
+            original_plan_id=original_plan_id
+        )
+    
+    if not plan_result["success"]:
+        raise JobError(plan_result["message"])
+    
+    async with session_scope() as db:
+        new_plan = await run_db(
+            db,
+            create_plan,
+            plan=PlanCreate(type=plan_type, content=plan_result["content"]),
+            user_id=user_id
+        )
+    
+    return {
+        "message": "Adaptive plan created successfully",
+        "plan": {
+            "id": new_plan.id,
+            "user_id": new_plan.user_id,
+            "type": new_plan.type,
+            "content": new_plan.content,
+            "created_at": new_plan.created_at
+        }
+    }
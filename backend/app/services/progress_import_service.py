@@ -0,0 +1,219 @@
+import codecs
+import csv
+import json
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.progress import Progress
+from app.schemas.progress import ProgressImport
+from app.services.cache_service import invalidate_forecasts, invalidate_progress_analysis
+from app.services.progress_rollup_service import METRIC_JSON_COLUMNS, refresh_progress_rollups_since, to_utc_date
+
+IMPORT_FORMATS = ("ndjson", "csv")
+CONTENT_TYPE_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+    "application/csv": "csv",
+}
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+
+# Plain CSV columns; JSON metrics use `measurement.<key>` and `workout.<key>` columns
+CSV_COLUMNS = ["date", "weight", "body_fat", "energy_level", "mood", "sleep_quality", "notes"]
+
+class InvalidImport(ValueError):
+    """
+    Raised when an upload cannot be imported at all (unknown format, bad CSV header, too many rows)
+    """
+
+def get_import_format(content_type: Optional[str], requested: Optional[str] = None) -> str:
+    """
+    Pick the upload format from an explicit `format` or the request's Content-Type
+    """
+    if requested:
+        if requested not in IMPORT_FORMATS:
+            raise InvalidImport(f"Unsupported format. Must be one of: {', '.join(IMPORT_FORMATS)}")
+        return requested
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type not in CONTENT_TYPE_FORMATS:
+        raise InvalidImport("Send the upload as application/x-ndjson or text/csv, or pass `format`")
+    return CONTENT_TYPE_FORMATS[media_type]
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Decode a UTF-8 byte stream into lines without buffering the whole body
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+async def iter_ndjson_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield None, f"Invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "Each line must be a JSON object"
+            continue
+        yield record, None
+
+def csv_record(header: List[str], values: List[str]) -> Dict[str, Any]:
+    """
+    Map a CSV row onto progress fields, folding `measurement.<key>` and `workout.<key>` columns
+    into their JSON fields and dropping empty cells
+    """
+    record: Dict[str, Any] = {}
+    for column, value in zip(header, values):
+        value = value.strip()
+        if not value:
+            continue
+        prefix, _, key = column.partition(".")
+        if key and prefix in METRIC_JSON_COLUMNS:
+            record.setdefault(METRIC_JSON_COLUMNS[prefix], {})[key] = value
+        else:
+            record[column] = value
+    return record
+
+async def iter_csv_records(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[Optional[Dict[str, Any]], Optional[str]]]:
+    header: Optional[List[str]] = None
+    pending: List[str] = []
+    async for line in lines:
+        pending.append(line)
+        # A quoted field may span lines; the record is complete once its quotes balance
+        if sum(part.count('"') for part in pending) % 2:
+            continue
+        text = "\n".join(pending)
+        pending = []
+        if not text.strip():
+            continue
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [column.strip() for column in values]
+            unknown = [
+                column for column in header
+                if column not in CSV_COLUMNS and column.partition(".")[0] not in METRIC_JSON_COLUMNS
+            ]
+            if "date" not in header or unknown:
+                raise InvalidImport(
+                    f"CSV header must include `date` and only use the columns {', '.join(CSV_COLUMNS)}, "
+                    f"measurement.<key> or workout.<key>"
+                )
+            continue
+        if len(values) > len(header):
+            yield None, f"Expected at most {len(header)} columns, got {len(values)}"
+            continue
+        yield csv_record(header, values), None
+    if pending:
+        yield None, "Unterminated quoted field"
+
+def to_utc(value: datetime) -> datetime:
+    """
+    Normalize a timestamp to aware UTC (naive timestamps are taken as UTC)
+    """
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+def format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(part) for part in detail['loc'])}: {detail['msg']}" if detail["loc"] else detail["msg"]
+        for detail in error.errors()
+    ]
+
+async def parse_progress_upload(chunks: AsyncIterator[bytes], upload_format: str, max_rows: int) -> Dict[str, Any]:
+    """
+    Stream-parse and validate an NDJSON or CSV progress upload
+
+    Rows are numbered from 1 in upload order, skipping blank lines and the CSV header.
+    Only the first row for each UTC day is kept; later rows for the same day count as duplicates.
+    """
+    lines = iter_lines(chunks)
+    records = iter_ndjson_records(lines) if upload_format == "ndjson" else iter_csv_records(lines)
+
+    entries: Dict[date, Dict[str, Any]] = {}
+    errors: List[Dict[str, Any]] = []
+    error_count = 0
+    duplicates = 0
+    rows = 0
+    async for record, error in records:
+        rows += 1
+        if rows > max_rows:
+            raise InvalidImport(f"Uploads are limited to {max_rows} rows")
+
+        row_errors = [error] if error else []
+        if record is not None:
+            try:
+                entry = ProgressImport(**record)
+            except ValidationError as e:
+                row_errors = format_validation_error(e)
+        if row_errors:
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({"row": rows, "errors": row_errors})
+            continue
+
+        values = entry.dict()
+        values["date"] = to_utc(values["date"])
+        day = to_utc_date(values["date"])
+        if day in entries:
+            duplicates += 1
+            continue
+        entries[day] = values
+
+    return {
+        "rows": rows,
+        "entries": entries,
+        "duplicates": duplicates,
+        "errors": errors,
+        "errors_truncated": error_count > len(errors)
+    }
+
+def import_progress_entries(db: Session, user_id: int, entries: Dict[date, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Insert validated progress entries (keyed by UTC day) for a user in batched executemany
+    statements, skipping days that already have an entry, then refresh rollups in the same transaction
+
+    Returns the number of entries imported and skipped as duplicates of existing entries.
+    """
+    if not entries:
+        return {"imported": 0, "duplicates": 0}
+
+    first_day, last_day = min(entries), max(entries)
+    existing_days = {
+        to_utc_date(row.date)
+        for row in db.query(Progress.date).filter(
+            Progress.user_id == user_id,
+            Progress.date >= datetime.combine(first_day, time.min),
+            Progress.date < datetime.combine(last_day + timedelta(days=1), time.min)
+        )
+    }
+    rows = [
+        {**values, "user_id": user_id}
+        for day, values in sorted(entries.items())
+        if day not in existing_days
+    ]
+
+    for offset in range(0, len(rows), IMPORT_BATCH_SIZE):
+        db.execute(insert(Progress), rows[offset:offset + IMPORT_BATCH_SIZE])
+    if rows:
+        refresh_progress_rollups_since(db, user_id, rows[0]["date"])
+    db.commit()
+
+    if rows:
+        invalidate_progress_analysis(user_id)
+        invalidate_forecasts(user_id)
+    return {"imported": len(rows), "duplicates": len(entries) - len(rows)}
@@ -0,0 +1,196 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from app.models.progress import Progress
+from app.models.progress_rollup import ProgressRollup
+from app.models.user import User
+
+METRIC_COLUMNS = ["weight", "body_fat", "energy_level", "mood", "sleep_quality"]
+# Metric prefix -> JSON column holding per-key values
+METRIC_JSON_COLUMNS = {"measurement": "measurements", "workout": "workout_performance"}
+
+PERIODS = ("day", "week")
+
+BACKFILL_BATCH_SIZE = 1000
+
+BucketKey = Tuple[str, date, str]
+
+def entry_metrics(entry: Progress) -> Dict[str, float]:
+    """
+    Get every numeric metric recorded on a progress entry, keyed by trend metric name
+    """
+    metrics = {}
+    for column in METRIC_COLUMNS:
+        value = getattr(entry, column)
+        if value is not None:
+            metrics[column] = float(value)
+    for prefix, column in METRIC_JSON_COLUMNS.items():
+        for key, value in (getattr(entry, column) or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{prefix}.{key}"] = float(value)
+    return metrics
+
+def to_utc_date(value: datetime) -> date:
+    """
+    Get the UTC calendar day of a timestamp (naive timestamps are already UTC)
+    """
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+def get_period_start(day: date, period: str) -> date:
+    """
+    Get the first day of the day or (Monday-based) week containing `day`
+    """
+    return day - timedelta(days=day.weekday()) if period == "week" else day
+
+def get_period_end(start: date, period: str) -> date:
+    return start + timedelta(days=7 if period == "week" else 1)
+
+def _accumulate(buckets: Dict[BucketKey, Dict[str, Any]], entries: Iterable[Progress], periods: Iterable[str]) -> None:
+    # Entries must arrive in (date, id) order so first/last are correct
+    for entry in entries:
+        if entry.date is None:
+            continue
+        day = to_utc_date(entry.date)
+        for metric, value in entry_metrics(entry).items():
+            for period in periods:
+                key = (period, get_period_start(day, period), metric)
+                bucket = buckets.get(key)
+                if bucket is None:
+                    buckets[key] = {"count": 1, "min": value, "max": value, "sum": value, "first": value, "last": value}
+                    continue
+                bucket["count"] += 1
+                bucket["min"] = min(bucket["min"], value)
+                bucket["max"] = max(bucket["max"], value)
+                bucket["sum"] += value
+                bucket["last"] = value
+
+def _rollup_rows(user_id: int, buckets: Dict[BucketKey, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "user_id": user_id,
+            "period": period,
+            "period_start": period_start,
+            "metric": metric,
+            "count": bucket["count"],
+            "min": bucket["min"],
+            "max": bucket["max"],
+            "avg": bucket["sum"] / bucket["count"],
+            "first": bucket["first"],
+            "last": bucket["last"]
+        }
+        for (period, period_start, metric), bucket in buckets.items()
+    ]
+
+def lock_user_rollups(db: Session, user_id: int) -> None:
+    """
+    Serialize rollup rebuilds for a user until the transaction ends by locking their user row
+
+    Rebuilds delete and re-insert buckets, so two concurrent writes for the same day or week
+    would otherwise both insert the bucket and the second would violate uq_progress_rollups_bucket.
+    FOR NO KEY UPDATE doesn't conflict with the key-share locks progress inserts take on the
+    user row, so writers can't deadlock on it. SQLite ignores the lock; its writers are serialized.
+    """
+    db.query(User.id).filter(User.id == user_id).with_for_update(key_share=True).one_or_none()
+
+def refresh_progress_rollups(db: Session, user_id: int, entry_date: datetime) -> None:
+    """
+    Rebuild the day and week rollups containing entry_date after an entry is created, updated or deleted
+
+    Only the raw entries of those two buckets are read, so the cost does not grow with history.
+    Runs in the caller's transaction and does not commit.
+    """
+    lock_user_rollups(db, user_id)
+    day = to_utc_date(entry_date)
+    for period in PERIODS:
+        start = get_period_start(day, period)
+        end = get_period_end(start, period)
+        entries = db.query(Progress).filter(
+            Progress.user_id == user_id,
+            Progress.date >= datetime.combine(start, time.min),
+            Progress.date < datetime.combine(end, time.min)
+        ).order_by(Progress.date, Progress.id).all()
+
+        buckets: Dict[BucketKey, Dict[str, Any]] = {}
+        _accumulate(buckets, entries, [period])
+
+        db.query(ProgressRollup).filter(
+            ProgressRollup.user_id == user_id,
+            ProgressRollup.period == period,
+            ProgressRollup.period_start == start
+        ).delete(synchronize_session=False)
+        rows = _rollup_rows(user_id, buckets)
+        if rows:
+            db.execute(insert(ProgressRollup), rows)
+
+def refresh_progress_rollups_since(db: Session, user_id: int, since: datetime) -> None:
+    """
+    Rebuild a user's day and week rollups from the week containing `since` onwards in one pass,
+    for bulk writes that touch many buckets at once
+
+    Runs in the caller's transaction and does not commit.
+    """
+    lock_user_rollups(db, user_id)
+    start = get_period_start(to_utc_date(since), "week")
+    buckets: Dict[BucketKey, Dict[str, Any]] = {}
+    entries = db.query(Progress).filter(
+        Progress.user_id == user_id,
+        Progress.date >= datetime.combine(start, time.min)
+    ).order_by(Progress.date, Progress.id).yield_per(BACKFILL_BATCH_SIZE)
+    _accumulate(buckets, entries, PERIODS)
+
+    db.query(ProgressRollup).filter(
+        ProgressRollup.user_id == user_id,
+        ProgressRollup.period_start >= start
+    ).delete(synchronize_session=False)
+    rows = _rollup_rows(user_id, buckets)
+    for offset in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        db.execute(insert(ProgressRollup), rows[offset:offset + BACKFILL_BATCH_SIZE])
+
+def rebuild_user_rollups(db: Session, user_id: int) -> int:
+    """
+    Rebuild all of a user's rollups from their raw progress entries in one pass and commit
+    Returns the number of rollup rows written
+    """
+    lock_user_rollups(db, user_id)
+    buckets: Dict[BucketKey, Dict[str, Any]] = {}
+    entries = db.query(Progress).filter(
+        Progress.user_id == user_id
+    ).order_by(Progress.date, Progress.id).yield_per(BACKFILL_BATCH_SIZE)
+    _accumulate(buckets, entries, PERIODS)
+
+    db.query(ProgressRollup).filter(ProgressRollup.user_id == user_id).delete(synchronize_session=False)
+    rows = _rollup_rows(user_id, buckets)
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        db.execute(insert(ProgressRollup), rows[start:start + BACKFILL_BATCH_SIZE])
+    db.commit()
+    return len(rows)
+
+def backfill_progress_rollups(db: Session, user_id: Optional[int] = None) -> Dict[str, int]:
+    """
+    Rebuild rollups for one user, or for every user with progress entries
+    """
+    if user_id is not None:
+        user_ids = [user_id]
+    else:
+        user_ids = [row.user_id for row in db.query(Progress.user_id).distinct().order_by(Progress.user_id)]
+
+    rows = 0
+    for current_user_id in user_ids:
+        rows += rebuild_user_rollups(db, current_user_id)
+    return {"users": len(user_ids), "rollups": rows}
+
+def get_rollup_series(db: Session, user_id: int, metrics: List[str], period: str, start_date: datetime) -> List[ProgressRollup]:
+    """
+    Get rollups of the given metrics for a user from the bucket containing start_date onwards,
+    ordered by metric and then oldest first
+    """
+    first_bucket = get_period_start(to_utc_date(start_date), period)
+    return db.query(ProgressRollup).filter(
+        ProgressRollup.user_id == user_id,
+        ProgressRollup.metric.in_(metrics),
+        ProgressRollup.period == period,
+        ProgressRollup.period_start >= first_bucket
+    ).order_by(ProgressRollup.metric, ProgressRollup.period_start).all()
@@ -1,8 +1,13 @@
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 from app.models.progress import Progress
 from app.schemas.progress import ProgressCreate, ProgressUpdate
-from typing import List, Optional, Dict, Any, Union
+from typing import Iterable, List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timedelta
+from app.core.config import settings
+from app.services.cache_service import invalidate_forecasts, invalidate_progress_analysis
+from app.services.progress_rollup_service import METRIC_COLUMNS, METRIC_JSON_COLUMNS, get_rollup_series, refresh_progress_rollups
+from app.utils.pagination import DEFAULT_PAGE_SIZE, paginate_keyset
 
 def create_progress_entry(db: Session, progress_data: ProgressCreate, user_id: int) -> Progress:
     """
@@ -20,8 +25,11 @@ def create_progress_entry(db: Session, progress_data: ProgressCreate, user_id: i
         notes=progress_data.notes
     )
     db.add(db_progress)
+    db.flush()
+    refresh_progress_rollups(db, user_id, db_progress.date)
     db.commit()
-    db.refresh(db_progress)
+    invalidate_progress_analysis(user_id)
+    invalidate_forecasts(user_id)
     return db_progress
 
 def get_progress_by_id(db: Session, progress_id: int) -> Optional[Progress]:
@@ -30,11 +38,12 @@ def get_progress_by_id(db: Session, progress_id: int) -> Optional[Progress]:
     """
     return db.query(Progress).filter(Progress.id == progress_id).first()
 
-def get_progress_by_user_id(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Progress]:
+def get_progress_by_user_id(db: Session, user_id: int, limit: int = DEFAULT_PAGE_SIZE, cursor: Optional[str] = None) -> Tuple[List[Progress], Optional[str]]:
     """
-    Get all progress entries for a user
+    Get a page of a user's progress entries, newest first, and the cursor for the next page
     """
-    return db.query(Progress).filter(Progress.user_id == user_id).order_by(Progress.date.desc()).offset(skip).limit(limit).all()
+    query = db.query(Progress).filter(Progress.user_id == user_id)
+    return paginate_keyset(query, Progress.date, Progress.id, limit, cursor)
 
 def get_progress_by_date_range(db: Session, user_id: int, start_date: datetime, end_date: datetime) -> List[Progress]:
     """
@@ -62,12 +71,15 @@ def update_progress(db: Session, progress_id: int, progress_data: Union[Progress
     if not progress:
         return None
     
-    for key, value in progress_data.dict() if hasattr(progress_data, 'dict') else progress_data.items():
+    for key, value in progress_data.dict().items() if hasattr(progress_data, 'dict') else progress_data.items():
         if value is not None:
             setattr(progress, key, value)
     
+    db.flush()
+    refresh_progress_rollups(db, progress.user_id, progress.date)
     db.commit()
-    db.refresh(progress)
+    invalidate_progress_analysis(progress.user_id)
+    invalidate_forecasts(progress.user_id)
     return progress
 
 def delete_progress(db: Session, progress_id: int) -> Dict[str, Any]:
@@ -79,45 +91,124 @@ def delete_progress(db: Session, progress_id: int) -> Dict[str, Any]:
         return {"success": False, "message": "Progress entry not found"}
     
     db.delete(progress)
+    db.flush()
+    refresh_progress_rollups(db, progress.user_id, progress.date)
     db.commit()
+    invalidate_progress_analysis(progress.user_id)
+    invalidate_forecasts(progress.user_id)
     return {"success": True, "message": "Progress entry deleted successfully"}
 
+def get_metric_column(metric: str):
+    """
+    Get the SQL expression selecting a progress metric, or None for an unknown metric
+    `measurement.<key>` and `workout.<key>` read the key from the JSON column with the dialect's JSON path operators
+    """
+    if metric in METRIC_COLUMNS:
+        return getattr(Progress, metric)
+    prefix, _, key = metric.partition(".")
+    if key and prefix in METRIC_JSON_COLUMNS:
+        return getattr(Progress, METRIC_JSON_COLUMNS[prefix])[key].as_float()
+    return None
+
+def empty_trend(metric: str, days: int, resolution: str = "entry") -> Dict[str, Any]:
+    return {"metric": metric, "data": [], "change": None, "period_days": days, "resolution": resolution}
+
+def build_metric_trends(points: Iterable[Tuple[datetime, Dict[str, Any]]], metrics: List[str], days: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Split chronological (date, {metric: value}) points into one trend per metric
+    """
+    trends = {metric: empty_trend(metric, days) for metric in metrics}
+    for date, values in points:
+        for metric in metrics:
+            value = values.get(metric)
+            if value is not None:
+                trends[metric]["data"].append({"date": date, "value": value})
+    for trend in trends.values():
+        if len(trend["data"]) >= 2:
+            trend["change"] = trend["data"][-1]["value"] - trend["data"][0]["value"]
+    return trends
+
+def get_rollup_trends(db: Session, user_id: int, metrics: List[str], days: int, start_date: datetime) -> Dict[str, Dict[str, Any]]:
+    """
+    Build trends for several metrics from weekly rollups, in one query
+    """
+    trends = {metric: empty_trend(metric, days, resolution="week") for metric in metrics}
+    rollups_by_metric: Dict[str, list] = {}
+    for rollup in get_rollup_series(db, user_id, metrics, "week", start_date):
+        rollups_by_metric.setdefault(rollup.metric, []).append(rollup)
+
+    for metric, rollups in rollups_by_metric.items():
+        trend = trends[metric]
+        trend["data"] = [
+            {"date": rollup.period_start, "value": rollup.avg, "min": rollup.min, "max": rollup.max}
+            for rollup in rollups
+        ]
+        if sum(rollup.count for rollup in rollups) >= 2:
+            trend["change"] = rollups[-1].last - rollups[0].first
+    return trends
+
+def get_progress_trends_for_metrics(db: Session, user_id: int, metrics: List[str], days: int = 90) -> Dict[str, Dict[str, Any]]:
+    """
+    Get trends for several progress metrics from a single scan of the window
+    Each row carries only the date and the requested metrics; unknown metrics get empty trends
+    """
+    columns = {metric: get_metric_column(metric) for metric in metrics}
+    known = [metric for metric in metrics if columns[metric] is not None]
+    if not known:
+        return build_metric_trends([], metrics, days)
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    if days >= settings.TREND_ROLLUP_MIN_DAYS:
+        trends = get_rollup_trends(db, user_id, known, days, start_date)
+        return {metric: trends.get(metric, empty_trend(metric, days)) for metric in metrics}
+
+    rows = db.query(
+        Progress.date,
+        *[columns[metric].label(f"metric_{index}") for index, metric in enumerate(known)]
+    ).filter(
+        Progress.user_id == user_id,
+        Progress.date >= start_date,
+        Progress.date <= end_date,
+        or_(*[columns[metric].isnot(None) for metric in known])
+    ).order_by(Progress.date, Progress.id).all()
+
+    return build_metric_trends(((row[0], dict(zip(known, row[1:]))) for row in rows), metrics, days)
+
 def get_progress_trends(db: Session, user_id: int, metric: str, days: int = 90) -> Dict[str, Any]:
     """
     Get trends for a specific progress metric over time
+    Only (date, value) pairs are read, oldest first, with the overall change computed in the same query
+    Windows of TREND_ROLLUP_MIN_DAYS or more read weekly rollups instead of raw entries
     """
-    progress_entries = get_recent_progress(db, user_id, days)
-    
-    trend_data = []
-    for entry in progress_entries:
-        if metric == "weight" and entry.weight is not None:
-            trend_data.append({"date": entry.date, "value": entry.weight})
-        elif metric == "body_fat" and entry.body_fat is not None:
-            trend_data.append({"date": entry.date, "value": entry.body_fat})
-        elif metric in ["energy_level", "mood", "sleep_quality"]:
-            value = getattr(entry, metric, None)
-            if value is not None:
-                trend_data.append({"date": entry.date, "value": value})
-        elif metric.startswith("measurement.") and entry.measurements:
-            measurement_key = metric.split(".", 1)[1]
-            if entry.measurements and measurement_key in entry.measurements:
-                trend_data.append({"date": entry.date, "value": entry.measurements[measurement_key]})
-        elif metric.startswith("workout.") and entry.workout_performance:
-            workout_key = metric.split(".", 1)[1]
-            if entry.workout_performance and workout_key in entry.workout_performance:
-                trend_data.append({"date": entry.date, "value": entry.workout_performance[workout_key]})
-    
-    trend_data.sort(key=lambda x: x["date"])
-    
-    change = None
-    if len(trend_data) >= 2:
-        first_value = trend_data[0]["value"]
-        last_value = trend_data[-1]["value"]
-        change = last_value - first_value
-    
-    return {
-        "metric": metric,
-        "data": trend_data,
-        "change": change,
-        "period_days": days
+    trend = empty_trend(metric, days)
+    value = get_metric_column(metric)
+    if value is None:
+        return trend
+
+    end_date = datetime.utcnow()
+    start_date = end_date - timedelta(days=days)
+
+    if days >= settings.TREND_ROLLUP_MIN_DAYS:
+        return get_rollup_trends(db, user_id, [metric], days, start_date)[metric]
+
+    window = {
+        "order_by": (Progress.date, Progress.id),
+        "rows": (None, None)
     }
+    rows = db.query(
+        Progress.date,
+        value.label("value"),
+        (func.last_value(value).over(**window) - func.first_value(value).over(**window)).label("change")
+    ).filter(
+        Progress.user_id == user_id,
+        Progress.date >= start_date,
+        Progress.date <= end_date,
+        value.isnot(None)
+    ).order_by(Progress.date, Progress.id).all()
+
+    trend["data"] = [{"date": row.date, "value": row.value} for row in rows]
+    if len(rows) >= 2:
+        trend["change"] = rows[0].change
+    return trend
@@ -0,0 +1,224 @@
+import numpy as np
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from sqlalchemy.orm import Session
+from app.models.progress import Progress
+from app.services.progress_rollup_service import entry_metrics
+from app.services.progress_service import get_recent_progress
+
+SECONDS_PER_DAY = 86400.0
+
+EWMA_SPAN = 7
+ROLLING_WINDOW_DAYS = 7
+# Robust z-score (median/MAD) above which a point is flagged as an outlier
+OUTLIER_Z = 3.5
+PLATEAU_WINDOW_DAYS = 14
+PLATEAU_MIN_POINTS = 3
+# Weekly change below this fraction of the metric's level counts as a plateau
+PLATEAU_RELATIVE_WEEKLY_CHANGE = 0.0025
+# Trends are fitted to daily means and need this many distinct days
+TREND_MIN_DAYS = 3
+MIN_CORRELATION_POINTS = 5
+
+SUBJECTIVE_METRICS = ["sleep_quality", "energy_level", "mood"]
+
+Series = Tuple[List[datetime], np.ndarray, np.ndarray]
+
+def build_metric_series(entries: Sequence[Progress], entry_values: Sequence[Dict[str, float]]) -> Dict[str, Series]:
+    """
+    Split chronological progress entries into per-metric (dates, day offsets, values) arrays
+    Offsets count days from midnight of the first entry's day, so their floor is the calendar day
+    """
+    if not entries:
+        return {}
+    origin = entries[0].date.replace(hour=0, minute=0, second=0, microsecond=0)
+    collected: Dict[str, Tuple[List[datetime], List[float], List[float]]] = {}
+    for entry, values in zip(entries, entry_values):
+        offset = (entry.date - origin).total_seconds() / SECONDS_PER_DAY
+        for metric, value in values.items():
+            dates, offsets, metric_values = collected.setdefault(metric, ([], [], []))
+            dates.append(entry.date)
+            offsets.append(offset)
+            metric_values.append(value)
+    return {
+        metric: (dates, np.asarray(offsets, dtype=float), np.asarray(values, dtype=float))
+        for metric, (dates, offsets, values) in collected.items()
+    }
+
+def daily_means(t: np.ndarray, y: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Average observations to one value per calendar day, returned as (day offsets, means)
+    """
+    days, index = np.unique(np.floor(t), return_inverse=True)
+    return days, np.bincount(index, weights=y) / np.bincount(index)
+
+def fit_line(t: np.ndarray, y: np.ndarray) -> Optional[Tuple[float, float, float]]:
+    """
+    Least-squares (slope per day, intercept, R²) of daily means, or None with fewer than
+    TREND_MIN_DAYS distinct days; entries logged minutes apart would otherwise give absurd slopes
+    """
+    days, means = daily_means(t, y)
+    if len(days) < TREND_MIN_DAYS:
+        return None
+    slope, intercept = np.polyfit(days, means, 1)
+    residuals = means - (slope * days + intercept)
+    total = np.sum((means - means.mean()) ** 2)
+    r2 = 1.0 - np.sum(residuals ** 2) / total if total > 0 else 1.0
+    return float(slope), float(intercept), float(r2)
+
+def linear_trend(t: np.ndarray, y: np.ndarray) -> Optional[Tuple[float, float]]:
+    """
+    Slope per day and R² of y's daily means, or None with fewer than TREND_MIN_DAYS distinct days
+    """
+    line = fit_line(t, y)
+    return (line[0], line[2]) if line is not None else None
+
+def ewma(y: np.ndarray, span: int = EWMA_SPAN) -> float:
+    """
+    Latest exponentially weighted moving average of y (bias-adjusted, like pandas' adjust=True)
+    """
+    alpha = 2.0 / (span + 1.0)
+    weights = (1.0 - alpha) ** np.arange(len(y) - 1, -1, -1)
+    return float(np.dot(weights, y) / weights.sum())
+
+def window_mean(t: np.ndarray, y: np.ndarray, start: float, end: float) -> Optional[float]:
+    mask = (t > start) & (t <= end)
+    return float(y[mask].mean()) if mask.any() else None
+
+def outlier_mask(t: np.ndarray, y: np.ndarray, threshold: float = OUTLIER_Z) -> np.ndarray:
+    """
+    Flag points whose robust z-score (median and MAD based) exceeds threshold
+    Scores are taken on residuals from the linear trend, so steady progress is not flagged
+    """
+    if len(y) < 3:
+        return np.zeros(len(y), dtype=bool)
+    residuals = y
+    line = fit_line(t, y)
+    if line is not None:
+        slope, intercept, _ = line
+        residuals = y - (slope * t + intercept)
+    median = np.median(residuals)
+    mad = np.median(np.abs(residuals - median))
+    if mad == 0:
+        return np.zeros(len(y), dtype=bool)
+    return np.abs(0.6745 * (residuals - median) / mad) > threshold
+
+def is_plateau(t: np.ndarray, y: np.ndarray) -> Optional[bool]:
+    """
+    Whether the metric has been flat over the last PLATEAU_WINDOW_DAYS, or None without enough points
+    """
+    mask = t >= t[-1] - PLATEAU_WINDOW_DAYS
+    if mask.sum() < PLATEAU_MIN_POINTS:
+        return None
+    trend = linear_trend(t[mask], y[mask])
+    if trend is None:
+        return None
+    level = abs(float(y[mask].mean())) or 1.0
+    return abs(trend[0] * 7) < PLATEAU_RELATIVE_WEEKLY_CHANGE * level
+
+def metric_stats(dates: List[datetime], t: np.ndarray, y: np.ndarray) -> Dict[str, Any]:
+    """
+    Summary statistics, trend and anomaly facts for one metric series
+    """
+    stats: Dict[str, Any] = {
+        "points": int(len(y)),
+        "latest": float(y[-1]),
+        "mean": float(y.mean()),
+        "min": float(y.min()),
+        "max": float(y.max()),
+        "slope_per_week": None,
+        "r2": None,
+        "ewma": ewma(y),
+        "rolling_7d_mean": window_mean(t, y, t[-1] - ROLLING_WINDOW_DAYS, t[-1]),
+        "week_over_week_change": None,
+        "plateau": is_plateau(t, y),
+        "outliers": []
+    }
+    trend = linear_trend(t, y)
+    if trend is not None:
+        stats["slope_per_week"] = trend[0] * 7
+        stats["r2"] = trend[1]
+
+    previous_week = window_mean(t, y, t[-1] - 2 * ROLLING_WINDOW_DAYS, t[-1] - ROLLING_WINDOW_DAYS)
+    if stats["rolling_7d_mean"] is not None and previous_week is not None:
+        stats["week_over_week_change"] = stats["rolling_7d_mean"] - previous_week
+
+    stats["outliers"] = [
+        {"date": dates[index], "value": float(y[index])}
+        for index in np.flatnonzero(outlier_mask(t, y))
+    ]
+    return stats
+
+def metric_correlations(entry_values: Sequence[Dict[str, float]]) -> List[Dict[str, Any]]:
+    """
+    Pearson correlations between subjective metrics and weight / workout performance,
+    over the entries where both were recorded
+    """
+    recorded = {metric for values in entry_values for metric in values}
+    targets = sorted(metric for metric in recorded if metric == "weight" or metric.startswith("workout."))
+    correlations = []
+    for subjective in SUBJECTIVE_METRICS:
+        if subjective not in recorded:
+            continue
+        for target in targets:
+            pairs = np.array([
+                (values[subjective], values[target])
+                for values in entry_values
+                if subjective in values and target in values
+            ])
+            if len(pairs) < MIN_CORRELATION_POINTS or np.ptp(pairs[:, 0]) == 0 or np.ptp(pairs[:, 1]) == 0:
+                continue
+            correlations.append({
+                "x": subjective,
+                "y": target,
+                "r": float(np.corrcoef(pairs[:, 0], pairs[:, 1])[0, 1]),
+                "points": int(len(pairs))
+            })
+    return correlations
+
+def compute_progress_stats(entries: Sequence[Progress], days: int) -> Dict[str, Any]:
+    """
+    Compute local statistics over chronological progress entries
+    """
+    entries = [entry for entry in entries if entry.date is not None]
+    entry_values = [entry_metrics(entry) for entry in entries]
+    series = build_metric_series(entries, entry_values)
+    return {
+        "days": days,
+        "entries": len(entries),
+        "metrics": {metric: metric_stats(*values) for metric, values in series.items()},
+        "correlations": metric_correlations(entry_values)
+    }
+
+def get_progress_stats(db: Session, user_id: int, days: int = 90) -> Dict[str, Any]:
+    """
+    Compute local statistics over a user's progress entries in the last `days` days
+    """
+    entries = list(reversed(get_recent_progress(db, user_id, days)))
+    return compute_progress_stats(entries, days)
+
+def summarize_stats_for_prompt(stats: Dict[str, Any], digits: int = 2) -> Dict[str, Any]:
+    """
+    Reduce progress statistics to compact, rounded facts for an LLM prompt
+    Outliers become a count and only correlations with |r| >= 0.3 are kept
+    """
+    def rounded(value):
+        return round(value, digits) if isinstance(value, float) else value
+
+    facts = {}
+    for metric, values in stats["metrics"].items():
+        facts[metric] = {
+            key: rounded(value)
+            for key, value in values.items()
+            if key not in ("outliers", "points", "min", "max") and value is not None
+        }
+        if values["outliers"]:
+            facts[metric]["outliers"] = len(values["outliers"])
+    return {
+        "metrics": facts,
+        "correlations": [
+            {**correlation, "r": rounded(correlation["r"])}
+            for correlation in stats["correlations"]
+            if abs(correlation["r"]) >= 0.3
+        ]
+    }
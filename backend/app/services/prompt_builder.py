@@ -0,0 +1,156 @@
+import json
+import math
+from typing import Any, Dict, List, Optional
+from app.utils.json_encoder import DateTimeEncoder
+
+# Rough average for English/JSON text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+NUMERIC_ENTRY_FIELDS = ["weight", "body_fat", "energy_level", "mood", "sleep_quality"]
+DICT_ENTRY_FIELDS = ["measurements", "workout_performance"]
+
+MIN_ENTRIES = 4
+MIN_PLAN_CHARS = 120
+DEFAULT_PLAN_CHARS = 1500
+
+def to_prompt_json(data: Any) -> str:
+    """
+    Serialize prompt data compactly (no indentation or spaces after separators)
+    """
+    return json.dumps(data, cls=DateTimeEncoder, separators=(",", ":"))
+
+def estimate_tokens(data: Any) -> int:
+    """
+    Estimate the token count of a string, or of data once serialized for a prompt
+    """
+    text = data if isinstance(data, str) else to_prompt_json(data)
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def drop_empty(value: Any) -> Any:
+    """
+    Recursively drop None, empty strings and empty containers
+    """
+    if isinstance(value, dict):
+        cleaned = {key: drop_empty(item) for key, item in value.items()}
+        return {key: item for key, item in cleaned.items() if item not in (None, "", [], {})}
+    if isinstance(value, list):
+        cleaned = [drop_empty(item) for item in value]
+        return [item for item in cleaned if item not in (None, "", [], {})]
+    return value
+
+def summarize_text(text: Optional[str], max_chars: int) -> Optional[str]:
+    """
+    Collapse whitespace and cut text at a word boundary to at most max_chars
+    """
+    if not text:
+        return text
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max_chars].rsplit(" ", 1)[0]
+    return f"{cut} ..."
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 2) if values else None
+
+def aggregate_entries(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Merge several progress entries into one, averaging numeric fields and per-key dict values
+    """
+    dates = [entry["date"] for entry in entries if entry.get("date")]
+    aggregated: Dict[str, Any] = {
+        "date": f"{min(dates)[:10]}..{max(dates)[:10]}" if dates else None,
+        "entries": len(entries)
+    }
+    for field in NUMERIC_ENTRY_FIELDS:
+        aggregated[field] = _mean([entry[field] for entry in entries if entry.get(field) is not None])
+    for field in DICT_ENTRY_FIELDS:
+        values: Dict[str, List[float]] = {}
+        for entry in entries:
+            for key, value in (entry.get(field) or {}).items():
+                if isinstance(value, (int, float)):
+                    values.setdefault(key, []).append(value)
+        aggregated[field] = {key: _mean(items) for key, items in values.items()}
+    return aggregated
+
+def downsample_entries(entries: List[Dict[str, Any]], max_entries: int) -> List[Dict[str, Any]]:
+    """
+    Reduce entries to at most max_entries chronological points by aggregating consecutive runs
+    """
+    entries = sorted(entries, key=lambda entry: entry.get("date") or "")
+    if len(entries) <= max_entries:
+        return entries
+    bucket_size = math.ceil(len(entries) / max_entries)
+    return [
+        aggregate_entries(entries[start:start + bucket_size])
+        for start in range(0, len(entries), bucket_size)
+    ]
+
+def summarize_trend(trend: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace a trend's data points with start/end/min/max, which is all the prompt needs
+    """
+    values = [point["value"] for point in trend.get("data", []) if point.get("value") is not None]
+    if not values:
+        return {"change": trend.get("change")}
+    return {
+        "start": values[0],
+        "end": values[-1],
+        "min": min(values),
+        "max": max(values),
+        "change": trend.get("change"),
+        "points": len(values)
+    }
+
+def _compact(data: Dict[str, Any], max_entries: Optional[int], plan_chars: int) -> Dict[str, Any]:
+    compacted = dict(data)
+    if "progress_entries" in data:
+        entries = data["progress_entries"] or []
+        compacted["progress_entries"] = downsample_entries(entries, max_entries) if max_entries else sorted(
+            entries, key=lambda entry: entry.get("date") or ""
+        )
+    if "trends" in data:
+        compacted["trends"] = {metric: summarize_trend(trend) for metric, trend in (data["trends"] or {}).items()}
+    if data.get("active_plans"):
+        compacted["active_plans"] = [
+            {**plan, "content": summarize_text(plan.get("content"), plan_chars)}
+            for plan in data["active_plans"]
+        ]
+    if data.get("original_plan"):
+        compacted["original_plan"] = {
+            **data["original_plan"],
+            "content": summarize_text(data["original_plan"].get("content"), plan_chars * 2)
+        }
+    return drop_empty(compacted)
+
+def build_budgeted_prompt_data(data: Dict[str, Any], token_budget: int) -> Dict[str, Any]:
+    """
+    Compact prompt data until its serialized size fits within token_budget
+
+    Nulls are always dropped and trends reduced to summary statistics. Then, while over
+    budget, progress entries are aggregated into fewer chronological buckets and plan
+    content is summarized more aggressively, halving each step; notes go last.
+    """
+    entry_count = len(data.get("progress_entries") or [])
+    max_entries: Optional[int] = None
+    plan_chars = DEFAULT_PLAN_CHARS
+
+    compacted = _compact(data, max_entries, plan_chars)
+    while estimate_tokens(compacted) > token_budget:
+        can_shrink_entries = (max_entries or entry_count) > MIN_ENTRIES
+        can_shrink_plans = plan_chars > MIN_PLAN_CHARS
+        if not can_shrink_entries and not can_shrink_plans:
+            break
+        if can_shrink_entries:
+            max_entries = max(MIN_ENTRIES, (max_entries or entry_count) // 2)
+        if can_shrink_plans:
+            plan_chars = max(MIN_PLAN_CHARS, plan_chars // 2)
+        compacted = _compact(data, max_entries, plan_chars)
+
+    if estimate_tokens(compacted) > token_budget and compacted.get("progress_entries"):
+        compacted["progress_entries"] = [
+            {key: value for key, value in entry.items() if key != "notes"}
+            for entry in compacted["progress_entries"]
+        ]
+
+    return compacted
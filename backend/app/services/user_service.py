@@ -1,9 +1,29 @@
+from dataclasses import asdict, dataclass
 from sqlalchemy.orm import Session
+from app.db.session import DBSession, run_db
 from app.models.user import User
 from app.schemas.user import UserCreate
-from app.utils.password import get_password_hash, verify_password
+from app.services.cache_service import (
+    cache_principal,
+    cache_token_version,
+    get_cached_principal,
+    get_cached_token_version,
+    invalidate_principal,
+    invalidate_token_version
+)
+from app.utils.cache import run_cache
+from app.utils.password import hash_password, verify_and_update_password
 from typing import Optional
 
+@dataclass(frozen=True)
+class Principal:
+    """
+    Lightweight view of the authenticated user, enough for request handlers
+    """
+    id: int
+    username: str
+    is_active: bool
+
 def get_user_by_username(db: Session, username: str) -> Optional[User]:
     """
     Get a user by username
@@ -22,11 +42,79 @@ def get_user_by_id(db: Session, user_id: int) -> Optional[User]:
     """
     return db.query(User).filter(User.id == user_id).first()
 
-def create_user(db: Session, user: UserCreate) -> User:
+def get_principal_by_username(db: Session, username: str) -> Optional[Principal]:
+    """
+    Load the principal for a username without materializing the full user
+    """
+    row = db.query(User.id, User.username, User.is_active).filter(User.username == username).first()
+    if row is None:
+        return None
+    return Principal(id=row.id, username=row.username, is_active=row.is_active is not False)
+
+async def resolve_principal(db: DBSession, username: str) -> Optional[Principal]:
+    """
+    Get the principal for an authenticated username, from the principal cache when possible
+    """
+    cached = await run_cache(get_cached_principal, username)
+    if cached is not None:
+        return Principal(**cached)
+
+    principal = await run_db(db, get_principal_by_username, username)
+    if principal is not None:
+        await run_cache(cache_principal, username, asdict(principal))
+    return principal
+
+def get_token_version(db: Session, user_id: int) -> Optional[int]:
+    """
+    Get a user's current token version
+    """
+    row = db.query(User.token_version).filter(User.id == user_id).first()
+    return row.token_version if row else None
+
+async def resolve_token_version(db: DBSession, user_id: int) -> Optional[int]:
+    """
+    Get a user's current token version, from the token version cache when possible
+    """
+    token_version = await run_cache(get_cached_token_version, user_id)
+    if token_version is not None:
+        return token_version
+
+    token_version = await run_db(db, get_token_version, user_id)
+    if token_version is not None:
+        await run_cache(cache_token_version, user_id, token_version)
+    return token_version
+
+def revoke_user_tokens(db: Session, user_id: int) -> Optional[User]:
+    """
+    Revoke every token issued to a user by bumping their token version
+    """
+    user = get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    user.token_version = User.token_version + 1
+    db.commit()
+    invalidate_token_version(user_id)
+    invalidate_principal(user.username)
+    return user
+
+def deactivate_user(db: Session, user_id: int) -> Optional[User]:
     """
-    Create a new user
+    Deactivate a user and revoke their tokens
+    """
+    user = get_user_by_id(db, user_id)
+    if user is None:
+        return None
+    user.is_active = False
+    user.token_version = User.token_version + 1
+    db.commit()
+    invalidate_token_version(user_id)
+    invalidate_principal(user.username)
+    return user
+
+def save_user(db: Session, user: UserCreate, hashed_password: str) -> User:
+    """
+    Store a new user with an already hashed password
     """
-    hashed_password = get_password_hash(user.password)
     db_user = User(
         username=user.username,
         email=user.email,
@@ -37,13 +125,33 @@ def create_user(db: Session, user: UserCreate) -> User:
     db.refresh(db_user)
     return db_user
 
-def authenticate_user(db: Session, username: str, password: str) -> Optional[User]:
+async def create_user(db: DBSession, user: UserCreate) -> User:
+    """
+    Create a new user, hashing the password in the hashing pool
+    """
+    hashed_password = await hash_password(user.password)
+    return await run_db(db, save_user, user, hashed_password)
+
+def update_password_hash(db: Session, user: User, hashed_password: str) -> User:
+    """
+    Replace a user's stored password hash
+    """
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+    return user
+
+async def authenticate_user(db: DBSession, username: str, password: str) -> Optional[User]:
     """
     Authenticate a user by username and password
+    Hashes created with an outdated bcrypt cost are transparently replaced on success
     """
-    user = get_user_by_username(db, username)
+    user = await run_db(db, get_user_by_username, username)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        user = await run_db(db, update_password_hash, user, new_hash)
     return user
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Optional, TypeVar
+from sqlalchemy.util import await_only
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.utils.json_encoder import DateTimeEncoder
+
+T = TypeVar("T")
+
+class CacheBackend(ABC):
+    """
+    Minimal key/value cache interface shared by the in-process and shared backends
+    Values must be JSON-serializable so any backend can store them
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+class LRUCache(CacheBackend):
+    """
+    Thread-safe in-process LRU cache with a per-entry TTL
+    """
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class RedisCache(CacheBackend):
+    """
+    Shared cache backed by Redis, for deployments running several workers
+    Requires the optional `redis` package
+    """
+    def __init__(self, url: str, namespace: str, ttl: Optional[float] = None):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("CACHE_URL points to Redis but the 'redis' package is not installed") from e
+        self.client = redis.Redis.from_url(url)
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Make a blocking Redis call without stalling the event loop
+
+        Off the loop (threadpool workers, the CLI) the call runs directly. Sync service code
+        running on the loop through an AsyncSession's run_sync waits for it in the threadpool,
+        the same way the async driver's queries are awaited. Other async code must go through
+        run_cache, which calls in from the threadpool.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return fn(*args, **kwargs)
+        return await_only(run_in_threadpool(fn, *args, **kwargs))
+
+    def _get(self, key: str) -> Optional[Any]:
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def _clear(self) -> None:
+        for key in self.client.scan_iter(match=self._key("*")):
+            self.client.delete(key)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._call(self._get, key)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self._call(self.client.set, self._key(key), json.dumps(value, cls=DateTimeEncoder), ex=int(ttl) if ttl else None)
+
+    def delete(self, key: str) -> None:
+        self._call(self.client.delete, self._key(key))
+
+    def clear(self) -> None:
+        self._call(self._clear)
+
+def uses_shared_cache() -> bool:
+    """
+    Whether CACHE_URL selects a shared (network) backend, whose calls block on I/O
+    """
+    return settings.CACHE_URL.startswith(("redis://", "rediss://", "unix://"))
+
+def create_cache(namespace: str, maxsize: int = 1024, ttl: Optional[float] = None) -> CacheBackend:
+    """
+    Create a cache for the given namespace using the backend selected by CACHE_URL
+    An empty CACHE_URL keeps the cache in-process
+    """
+    if uses_shared_cache():
+        return RedisCache(settings.CACHE_URL, namespace=namespace, ttl=ttl)
+    return LRUCache(maxsize=maxsize, ttl=ttl)
+
+async def run_cache(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Await a cache function from async code without blocking the event loop
+    Shared backends are called from the threadpool; the in-process cache is called inline.
+    """
+    if uses_shared_cache():
+        return await run_in_threadpool(fn, *args, **kwargs)
+    return fn(*args, **kwargs)
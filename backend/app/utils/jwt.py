@@ -17,16 +17,36 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_user_access_token(user, expires_delta: Optional[timedelta] = None):
+    """
+    Create an access token carrying the claims needed to authenticate without a user lookup
+    """
+    return create_access_token(
+        data={
+            "sub": user.username,
+            "uid": user.id,
+            "is_active": user.is_active is not False,
+            "ver": user.token_version or 0
+        },
+        expires_delta=expires_delta
+    )
+
 def verify_token(token: str):
     """
-    Verify a JWT token and return the username
+    Verify a JWT token and return its claims
+    Tokens issued before uid/is_active/ver claims were added only carry the username
     """
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             return None
-        token_data = TokenData(username=username)
+        token_data = TokenData(
+            username=username,
+            uid=payload.get("uid"),
+            is_active=payload.get("is_active"),
+            token_version=payload.get("ver")
+        )
         return token_data
     except JWTError:
         return None
@@ -0,0 +1,179 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Metrics live in this process's default registry and are read on scrape; with several
+# workers each one exposes its own numbers.
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status",
+    ["method", "route", "status"]
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Database statement latency by engine and statement type",
+    ["engine", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Database statements that raised, by engine and statement type",
+    ["engine", "operation"]
+)
+
+LLM_CALL_DURATION = Histogram(
+    "llm_call_duration_seconds",
+    "Upstream LLM call latency by call site (streams are timed to their last chunk)",
+    ["call_site"],
+    buckets=(0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0)
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "LLM tokens used by call site and kind (prompt or completion)",
+    ["call_site", "kind"]
+)
+LLM_ERRORS = Counter(
+    "llm_call_errors_total",
+    "Failed LLM calls by call site and exception type",
+    ["call_site", "error"]
+)
+LLM_IN_FLIGHT = Gauge(
+    "llm_calls_in_flight",
+    "LLM calls currently waiting on the upstream API",
+    ["call_site"]
+)
+
+DB_OPERATIONS = ("SELECT", "INSERT", "UPDATE", "DELETE")
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request, labelled by the matched route template
+    so path parameters don't multiply the series; unmatched paths share one label
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status_code)).observe(time.perf_counter() - start)
+
+def route_template(scope) -> str:
+    """
+    The matched route's path template, e.g. /api/v1/progress/{progress_id}
+    Rebuilt from the request path and its path parameters, since routes of included
+    routers only know their path relative to the router's prefix
+    """
+    if scope.get("route") is None:
+        return "unmatched"
+    params = {str(value): name for name, value in scope.get("path_params", {}).items()}
+    return "/".join(
+        f"{{{params[segment]}}}" if segment in params else segment
+        for segment in scope["path"].split("/")
+    )
+
+def statement_operation(statement: str) -> str:
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return operation if operation in DB_OPERATIONS else "OTHER"
+
+def instrument_engine(engine: Engine, name: str) -> None:
+    """
+    Time every statement an engine executes (executemany counts once)
+    For an async engine, pass its sync_engine.
+    """
+    @event.listens_for(engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def observe_query(conn, cursor, statement, parameters, context, executemany):
+        start = conn.info["query_start"].pop()
+        DB_QUERY_DURATION.labels(name, statement_operation(statement)).observe(time.perf_counter() - start)
+
+    @event.listens_for(engine, "handle_error")
+    def count_query_error(exception_context):
+        timers = exception_context.connection.info.get("query_start") if exception_context.connection is not None else None
+        if timers:
+            timers.pop()
+        DB_QUERY_ERRORS.labels(name, statement_operation(exception_context.statement or "")).inc()
+
+class PoolStatsCollector:
+    """
+    Reports connection pool gauges and checkout counters at scrape time, so nothing is
+    recorded on the request path beyond the pool's own checkout timing
+    """
+    def __init__(self, get_stats: Callable[[], Dict[str, Dict[str, Any]]]):
+        self.get_stats = get_stats
+
+    def collect(self):
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Connections the pool keeps open", labels=["engine"]),
+            "checked_out": GaugeMetricFamily("db_pool_checked_out", "Connections currently checked out", labels=["engine"]),
+            "checked_in": GaugeMetricFamily("db_pool_checked_in", "Idle connections in the pool", labels=["engine"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["engine"]),
+            "wait_seconds_max": GaugeMetricFamily("db_pool_checkout_wait_seconds_max", "Longest checkout wait since the process started", labels=["engine"])
+        }
+        counters = {
+            "checkouts": CounterMetricFamily("db_pool_checkouts", "Connection checkouts", labels=["engine"]),
+            "timeouts": CounterMetricFamily("db_pool_checkout_timeouts", "Checkouts that timed out waiting for a connection", labels=["engine"]),
+            "wait_seconds_total": CounterMetricFamily("db_pool_checkout_wait_seconds", "Time spent checking out connections", labels=["engine"])
+        }
+        for engine_name, stats in self.get_stats().items():
+            for key, metric in {**gauges, **counters}.items():
+                if key in stats:
+                    metric.add_metric([engine_name], stats[key])
+        yield from gauges.values()
+        yield from counters.values()
+
+def register_pool_collector(get_stats: Callable[[], Dict[str, Dict[str, Any]]]) -> None:
+    REGISTRY.register(PoolStatsCollector(get_stats))
+
+@asynccontextmanager
+async def track_llm_call(call_site: str) -> AsyncIterator[None]:
+    """
+    Time an upstream LLM call and count it in flight; failures are counted by exception type
+    """
+    LLM_IN_FLIGHT.labels(call_site).inc()
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        LLM_ERRORS.labels(call_site, type(e).__name__).inc()
+        raise
+    finally:
+        LLM_CALL_DURATION.labels(call_site).observe(time.perf_counter() - start)
+        LLM_IN_FLIGHT.labels(call_site).dec()
+
+def record_llm_usage(call_site: str, usage: Optional[Any]) -> None:
+    """
+    Count the prompt and completion tokens from an OpenAI usage object, when present
+    """
+    if usage is None:
+        return
+    LLM_TOKENS.labels(call_site, "prompt").inc(getattr(usage, "prompt_tokens", 0) or 0)
+    LLM_TOKENS.labels(call_site, "completion").inc(getattr(usage, "completion_tokens", 0) or 0)
+
+def render_metrics() -> bytes:
+    return generate_latest(REGISTRY)
+
+METRICS_CONTENT_TYPE = CONTENT_TYPE_LATEST
@@ -0,0 +1,53 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+class InvalidCursor(ValueError):
+    """
+    Raised when a pagination cursor cannot be decoded
+    """
+
+def encode_cursor(sort_value: datetime, row_id: Any) -> str:
+    """
+    Encode the sort key of the last row on a page into an opaque cursor
+    """
+    payload = json.dumps([sort_value.isoformat(), row_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, Any]:
+    """
+    Decode a cursor produced by encode_cursor back into its (sort value, id) pair
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(sort_value), row_id
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as e:
+        raise InvalidCursor("Invalid pagination cursor") from e
+
+def paginate_keyset(query: Query, sort_column, id_column, limit: int, cursor: Optional[str] = None) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one newest-first page of `query` ordered by (sort_column, id_column)
+
+    Pages continue strictly after the cursor's row with a row-value comparison, so with an
+    index on (..., sort_column, id_column) each page is an index seek no matter how deep it is.
+    Returns the page and the cursor for the next one (None on the last page).
+    """
+    if cursor:
+        sort_value, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(sort_column, id_column) < tuple_(sort_value, row_id))
+
+    rows = query.order_by(sort_column.desc(), id_column.desc()).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, sort_column.key), getattr(last, id_column.key))
@@ -1,6 +1,43 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
 from passlib.context import CryptContext
+from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max rounds to the configured cost makes needs_update() flag any hash
+# created with a different cost, so changing BCRYPT_ROUNDS rehashes passwords on login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS
+)
+
+# bcrypt releases the GIL while hashing, so a thread pool spreads the work across cores
+# without blocking the event loop. Its size bounds how many hashes run at once.
+_hash_executor: Optional[ThreadPoolExecutor] = None
+
+def get_hash_executor() -> ThreadPoolExecutor:
+    """
+    Returns the shared password hashing pool, creating it on first use
+    """
+    global _hash_executor
+    if _hash_executor is None:
+        _hash_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _hash_executor
+
+def shutdown_hash_executor() -> None:
+    """
+    Shut down the password hashing pool
+    """
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
 
 def verify_password(plain_password, hashed_password):
     """
@@ -13,3 +50,20 @@ def get_password_hash(password):
     Hash a password
     """
     return pwd_context.hash(password)
+
+async def hash_password(password: str) -> str:
+    """
+    Hash a password in the hashing pool
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_hash_executor(), pwd_context.hash, password)
+
+async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the hashing pool
+    Returns whether it matched and, if the stored hash uses an outdated cost, a replacement hash
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_hash_executor(), pwd_context.verify_and_update, plain_password, hashed_password
+    )
@@ -0,0 +1,113 @@
+"""Initial schema (tables previously created by Base.metadata.create_all)
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=True),
+        sa.Column("email", sa.String(), nullable=True),
+        sa.Column("hashed_password", sa.String(), nullable=True),
+        sa.Column("is_active", sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "plans",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("type", sa.String(length=50), nullable=True),
+        sa.Column("content", sa.Text(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_plans_id", "plans", ["id"])
+
+    op.create_table(
+        "user_profiles",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("height", sa.Float(), nullable=True),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("age", sa.Integer(), nullable=True),
+        sa.Column("fitness_level", sa.String(), nullable=True),
+        sa.Column("fitness_goal", sa.String(), nullable=True),
+        sa.Column("dietary_preferences", sa.String(), nullable=True),
+        sa.Column("workout_preferences", sa.String(), nullable=True),
+        sa.Column("available_equipment", sa.String(), nullable=True),
+        sa.Column("health_conditions", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id"),
+    )
+    op.create_index("ix_user_profiles_id", "user_profiles", ["id"])
+
+    op.create_table(
+        "progress",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=True),
+        sa.Column("date", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("weight", sa.Float(), nullable=True),
+        sa.Column("body_fat", sa.Float(), nullable=True),
+        sa.Column("measurements", sa.JSON(), nullable=True),
+        sa.Column("workout_performance", sa.JSON(), nullable=True),
+        sa.Column("energy_level", sa.Integer(), nullable=True),
+        sa.Column("mood", sa.Integer(), nullable=True),
+        sa.Column("sleep_quality", sa.Integer(), nullable=True),
+        sa.Column("notes", sa.String(length=500), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_progress_id", "progress", ["id"])
+
+    op.create_table(
+        "chat_messages",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("role", sa.String(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("timestamp", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column("is_plan", sa.Boolean(), nullable=True),
+        sa.Column("plan_type", sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_chat_messages_id", "chat_messages", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chat_messages_id", table_name="chat_messages")
+    op.drop_table("chat_messages")
+    op.drop_index("ix_progress_id", table_name="progress")
+    op.drop_table("progress")
+    op.drop_index("ix_user_profiles_id", table_name="user_profiles")
+    op.drop_table("user_profiles")
+    op.drop_index("ix_plans_id", table_name="plans")
+    op.drop_table("plans")
+    op.drop_index("ix_users_email", table_name="users")
+    op.drop_index("ix_users_username", table_name="users")
+    op.drop_index("ix_users_id", table_name="users")
+    op.drop_table("users")
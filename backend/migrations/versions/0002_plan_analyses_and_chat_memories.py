@@ -0,0 +1,63 @@
+"""Add plan_analyses and chat_memories
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 00:00:01
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Databases stamped at 0001 may already have these from Base.metadata.create_all
+    existing_tables = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "plan_analyses" not in existing_tables:
+        op.create_table(
+            "plan_analyses",
+            sa.Column("id", sa.String(), nullable=False),
+            sa.Column("plan_id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("content_hash", sa.String(length=64), nullable=False),
+            sa.Column("profile_fingerprint", sa.String(length=64), nullable=False),
+            sa.Column("analysis", sa.Text(), nullable=False),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["plan_id"], ["plans.id"]),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("plan_id", "content_hash", "profile_fingerprint", name="uq_plan_analyses_inputs"),
+        )
+        op.create_index("ix_plan_analyses_id", "plan_analyses", ["id"])
+
+    if "chat_memories" not in existing_tables:
+        op.create_table(
+            "chat_memories",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("summary", sa.Text(), nullable=False),
+            sa.Column("summarized_until", sa.DateTime(timezone=True), nullable=True),
+            sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+        op.create_index("ix_chat_memories_id", "chat_memories", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chat_memories_id", table_name="chat_memories")
+    op.drop_table("chat_memories")
+    op.drop_index("ix_plan_analyses_id", table_name="plan_analyses")
+    op.drop_table("plan_analyses")
@@ -0,0 +1,33 @@
+"""Add composite indexes for per-user, time-ordered queries
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 00:00:02
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_progress_user_id_date", "progress", ["user_id", "date"])
+    op.create_index("ix_plans_user_id_created_at", "plans", ["user_id", "created_at"])
+    op.create_index("ix_plans_user_id_type_created_at", "plans", ["user_id", "type", "created_at"])
+    op.create_index("ix_chat_messages_user_id_timestamp", "chat_messages", ["user_id", "timestamp"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chat_messages_user_id_timestamp", table_name="chat_messages")
+    op.drop_index("ix_plans_user_id_type_created_at", table_name="plans")
+    op.drop_index("ix_plans_user_id_created_at", table_name="plans")
+    op.drop_index("ix_progress_user_id_date", table_name="progress")
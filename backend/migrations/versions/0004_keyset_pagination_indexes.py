@@ -0,0 +1,47 @@
+"""Extend per-user time-ordered indexes with id for keyset pagination
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 00:00:03
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, timestamp column, old index columns, old index name, new index name)
+INDEXES = [
+    ("progress", "date", ["user_id", "date"], "ix_progress_user_id_date", "ix_progress_user_id_date_id"),
+    ("plans", "created_at", ["user_id", "created_at"], "ix_plans_user_id_created_at", "ix_plans_user_id_created_at_id"),
+    ("plans", "created_at", ["user_id", "type", "created_at"], "ix_plans_user_id_type_created_at", "ix_plans_user_id_type_created_at_id"),
+    ("chat_messages", "timestamp", ["user_id", "timestamp"], "ix_chat_messages_user_id_timestamp", "ix_chat_messages_user_id_timestamp_id"),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == "sqlite":
+        # SQLite stores datetimes as text. Rows written by the CURRENT_TIMESTAMP server default
+        # lack the microseconds SQLAlchemy writes and binds, which breaks keyset comparisons.
+        for table, column in {(table, column) for table, column, *_ in INDEXES}:
+            op.execute(
+                f'UPDATE {table} SET "{column}" = "{column}" || \'.000000\' WHERE length("{column}") = 19'
+            )
+
+    for table, _, columns, old_name, new_name in INDEXES:
+        op.drop_index(old_name, table_name=table)
+        op.create_index(new_name, table, columns + ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, _, columns, old_name, new_name in reversed(INDEXES):
+        op.drop_index(new_name, table_name=table)
+        op.create_index(old_name, table, columns)
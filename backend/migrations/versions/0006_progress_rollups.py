@@ -0,0 +1,153 @@
+"""Add progress_rollups
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 00:00:05
+
+"""
+from datetime import timedelta, timezone
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006"
+down_revision: Union[str, Sequence[str], None] = "0005"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables and rollup rules as of this revision, so the backfill doesn't change with later models
+progress = sa.table(
+    "progress",
+    sa.column("id", sa.Integer()),
+    sa.column("user_id", sa.Integer()),
+    sa.column("date", sa.DateTime(timezone=True)),
+    sa.column("weight", sa.Float()),
+    sa.column("body_fat", sa.Float()),
+    sa.column("measurements", sa.JSON()),
+    sa.column("workout_performance", sa.JSON()),
+    sa.column("energy_level", sa.Integer()),
+    sa.column("mood", sa.Integer()),
+    sa.column("sleep_quality", sa.Integer()),
+)
+progress_rollups = sa.table(
+    "progress_rollups",
+    sa.column("user_id", sa.Integer()),
+    sa.column("period", sa.String()),
+    sa.column("period_start", sa.Date()),
+    sa.column("metric", sa.String()),
+    sa.column("count", sa.Integer()),
+    sa.column("min", sa.Float()),
+    sa.column("max", sa.Float()),
+    sa.column("avg", sa.Float()),
+    sa.column("first", sa.Float()),
+    sa.column("last", sa.Float()),
+)
+METRIC_COLUMNS = ["weight", "body_fat", "energy_level", "mood", "sleep_quality"]
+METRIC_JSON_COLUMNS = {"measurement": "measurements", "workout": "workout_performance"}
+BATCH_SIZE = 1000
+
+
+def _row_metrics(row) -> dict:
+    metrics = {}
+    for column in METRIC_COLUMNS:
+        if row[column] is not None:
+            metrics[column] = float(row[column])
+    for prefix, column in METRIC_JSON_COLUMNS.items():
+        for key, value in (row[column] or {}).items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                metrics[f"{prefix}.{key}"] = float(value)
+    return metrics
+
+
+def _rollup_rows(user_id: int, buckets: dict) -> list:
+    return [
+        {
+            "user_id": user_id,
+            "period": period,
+            "period_start": period_start,
+            "metric": metric,
+            "count": bucket["count"],
+            "min": bucket["min"],
+            "max": bucket["max"],
+            "avg": bucket["sum"] / bucket["count"],
+            "first": bucket["first"],
+            "last": bucket["last"],
+        }
+        for (period, period_start, metric), bucket in buckets.items()
+    ]
+
+
+def backfill_rollups(bind) -> None:
+    """Build day and week rollups for existing progress, one user at a time."""
+    rows = bind.execute(
+        sa.select(progress)
+        .where(progress.c.date.isnot(None), progress.c.user_id.isnot(None))
+        .order_by(progress.c.user_id, progress.c.date, progress.c.id)
+        .execution_options(yield_per=BATCH_SIZE)
+    ).mappings()
+
+    def flush(user_id, buckets):
+        values = _rollup_rows(user_id, buckets)
+        for offset in range(0, len(values), BATCH_SIZE):
+            bind.execute(sa.insert(progress_rollups), values[offset:offset + BATCH_SIZE])
+
+    user_id, buckets = None, {}
+    for row in rows:
+        if row["user_id"] != user_id:
+            if buckets:
+                flush(user_id, buckets)
+            user_id, buckets = row["user_id"], {}
+        date = row["date"]
+        day = (date.astimezone(timezone.utc) if date.tzinfo is not None else date).date()
+        for metric, value in _row_metrics(row).items():
+            for period, start in (("day", day), ("week", day - timedelta(days=day.weekday()))):
+                bucket = buckets.get((period, start, metric))
+                if bucket is None:
+                    buckets[(period, start, metric)] = {
+                        "count": 1, "min": value, "max": value, "sum": value, "first": value, "last": value
+                    }
+                    continue
+                bucket["count"] += 1
+                bucket["min"] = min(bucket["min"], value)
+                bucket["max"] = max(bucket["max"], value)
+                bucket["sum"] += value
+                bucket["last"] = value
+    if buckets:
+        flush(user_id, buckets)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "progress_rollups",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("period", sa.String(length=8), nullable=False),
+        sa.Column("period_start", sa.Date(), nullable=False),
+        sa.Column("metric", sa.String(length=100), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.Column("min", sa.Float(), nullable=False),
+        sa.Column("max", sa.Float(), nullable=False),
+        sa.Column("avg", sa.Float(), nullable=False),
+        sa.Column("first", sa.Float(), nullable=False),
+        sa.Column("last", sa.Float(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("user_id", "metric", "period", "period_start", name="uq_progress_rollups_bucket"),
+    )
+    op.create_index("ix_progress_rollups_id", "progress_rollups", ["id"])
+
+    # Long-window trends read only rollups, so build them for existing progress now.
+    # Offline (--sql) runs can't read data; run `python -m app.cli backfill-rollups` after those.
+    if not context.is_offline_mode():
+        backfill_rollups(op.get_bind())
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_progress_rollups_id", table_name="progress_rollups")
+    op.drop_table("progress_rollups")
@@ -25,7 +25,7 @@ import {
   Legend, 
   ResponsiveContainer 
 } from 'recharts';
-import { getMetricTrends } from '@/services/progressService';
+import { getTrends } from '@/services/progressService';
 import { 
   ProgressTrend, 
   MEASUREMENT_FIELDS, 
@@ -38,7 +38,7 @@ import { format } from 'date-fns';
 export default function ProgressTrends() {
   const [selectedMetric, setSelectedMetric] = useState<string>('weight');
   const [timeRange, setTimeRange] = useState<number>(90);
-  const [trendData, setTrendData] = useState<ProgressTrend | null>(null);
+  const [trendsByMetric, setTrendsByMetric] = useState<Record<string, ProgressTrend>>({});
   const [isLoading, setIsLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
 
@@ -48,17 +48,20 @@ export default function ProgressTrends() {
     ...COMMON_EXERCISES
   ];
 
+  const trendData = trendsByMetric[selectedMetric] ?? null;
+
+  // All metrics for the range come back in one request, so switching metric needs no fetch
   useEffect(() => {
     fetchTrendData();
-  }, [selectedMetric, timeRange]);
+  }, [timeRange]);
 
   const fetchTrendData = async () => {
     setIsLoading(true);
     setError(null);
     
     try {
-      const data = await getMetricTrends(selectedMetric, timeRange);
-      setTrendData(data);
+      const data = await getTrends(allMetrics.map(metric => metric.key), timeRange);
+      setTrendsByMetric(data.trends);
     } catch (err) {
       console.error('Error fetching trend data:', err);
       setError(err instanceof Error ? err.message : 'Failed to load trend data');
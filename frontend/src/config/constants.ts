@@ -29,6 +29,9 @@ export const COMMON_EXERCISES = [
 // Base API URL from environment variable with fallback
 export const API_BASE_URL = process.env.NEXT_PUBLIC_BACKEND_URL || '';
 
+// Largest page the list endpoints return (the backend's MAX_PAGE_SIZE)
+export const MAX_PAGE_SIZE = 200;
+
 // All API endpoints used in the application
 export const API_ENDPOINTS = {
   // Auth endpoints
@@ -49,5 +52,8 @@ export const API_ENDPOINTS = {
   // Progress endpoints
   PROGRESS: '/api/v1/progress',
   PROGRESS_ANALYSIS: '/api/v1/progress/analysis',
-  ADAPTIVE_PLAN: '/api/v1/progress/adaptive-plan'
+  ADAPTIVE_PLAN: '/api/v1/progress/adaptive-plan',
+  
+  // Background job endpoints
+  JOBS: '/api/v1/jobs'  // Append /{id} or /{id}/wait when using
 };
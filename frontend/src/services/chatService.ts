@@ -19,6 +19,7 @@ export interface ChatResponse {
 
 export interface ChatHistoryResponse {
   messages: Message[];
+  next_cursor?: string | null;
 }
 
 export const chatService = {
@@ -63,7 +64,8 @@ export const chatService = {
 
       const data: ChatHistoryResponse = await response.json();
       
-      return data.messages.map(message => ({
+      // The API pages newest first; the chat view renders oldest first
+      return data.messages.slice().reverse().map(message => ({
         ...message,
         timestamp: new Date(message.timestamp)
       }));
@@ -1,3 +1,5 @@
+import { MAX_PAGE_SIZE } from '@/config/constants';
+
 const API_URL = `${process.env.NEXT_PUBLIC_BACKEND_URL}/api/v1`;
 
 export interface Plan {
@@ -40,7 +42,7 @@ export const getPlanById = async (planId: string | number): Promise<Plan> => {
 };
 
 /**
- * Get all plans for the current user
+ * Get all plans for the current user, newest first, following next_cursor across pages
  */
 export const getAllPlans = async (): Promise<Plan[]> => {
   const token = localStorage.getItem('token');
@@ -48,19 +50,31 @@ export const getAllPlans = async (): Promise<Plan[]> => {
     throw new Error('Authentication required');
   }
 
-  const response = await fetch(`${API_URL}/plans/`, {
-    headers: {
-      'Authorization': `Bearer ${token}`,
-    },
-  });
-
-  if (!response.ok) {
-    const error = await response.json();
-    throw new Error(error.detail || 'Failed to fetch plans');
-  }
-
-  const data = await response.json();
-  return data.plans;
+  const plans: Plan[] = [];
+  let cursor: string | null | undefined;
+  do {
+    const params = new URLSearchParams({ limit: String(MAX_PAGE_SIZE) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+
+    const response = await fetch(`${API_URL}/plans/?${params}`, {
+      headers: {
+        'Authorization': `Bearer ${token}`,
+      },
+    });
+
+    if (!response.ok) {
+      const error = await response.json();
+      throw new Error(error.detail || 'Failed to fetch plans');
+    }
+
+    const data = await response.json();
+    plans.push(...data.plans);
+    cursor = data.next_cursor;
+  } while (cursor);
+
+  return plans;
 };
 
 /**
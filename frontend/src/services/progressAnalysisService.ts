@@ -1,5 +1,5 @@
 import { API_ENDPOINTS } from '@/config/constants';
-import { ProgressAnalysis, AdaptivePlanRequest, AdaptivePlanResponse } from '@/types/progress';
+import { ProgressAnalysis, AdaptivePlanRequest, AdaptivePlanResponse, JobResponse } from '@/types/progress';
 
 const API_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
@@ -33,6 +33,7 @@ export const getProgressAnalysis = async (days: number = 30): Promise<ProgressAn
 
 /**
  * Generate an adaptive plan based on user's progress data
+ * The backend queues the generation as a job, so this waits on the job until it finishes
  * @param request Plan generation request parameters
  * @returns Promise with the generated plan
  */
@@ -43,13 +44,17 @@ export const generateAdaptivePlan = async (request: AdaptivePlanRequest): Promis
     throw new Error('Authentication required');
   }
   
-  const response = await fetch(`${API_URL}${API_ENDPOINTS.ADAPTIVE_PLAN}`, {
+  const params = new URLSearchParams({ plan_type: request.plan_type });
+  if (request.original_plan_id) {
+    params.append('original_plan_id', String(request.original_plan_id));
+  }
+  
+  const response = await fetch(`${API_URL}${API_ENDPOINTS.ADAPTIVE_PLAN}?${params.toString()}`, {
     method: 'POST',
     headers: {
       'Authorization': `Bearer ${token}`,
       'Content-Type': 'application/json'
-    },
-    body: JSON.stringify(request)
+    }
   });
   
   if (!response.ok) {
@@ -57,5 +62,32 @@ export const generateAdaptivePlan = async (request: AdaptivePlanRequest): Promis
     throw new Error(errorData.detail || 'Failed to generate adaptive plan');
   }
   
-  return response.json();
+  let job: JobResponse = await response.json();
+  
+  while (job.status === 'pending' || job.status === 'running') {
+    const waitResponse = await fetch(`${API_URL}${API_ENDPOINTS.JOBS}/${job.job_id}/wait?timeout=30`, {
+      method: 'GET',
+      headers: {
+        'Authorization': `Bearer ${token}`,
+        'Content-Type': 'application/json'
+      }
+    });
+    
+    if (!waitResponse.ok) {
+      const errorData = await waitResponse.json().catch(() => ({}));
+      throw new Error(errorData.detail || 'Failed to generate adaptive plan');
+    }
+    
+    job = await waitResponse.json();
+  }
+  
+  if (job.status === 'failed') {
+    return { success: false, message: job.error || 'Failed to generate adaptive plan' };
+  }
+  
+  return {
+    success: true,
+    message: job.result?.message,
+    plan: job.result?.plan
+  };
 };
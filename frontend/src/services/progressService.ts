@@ -1,5 +1,5 @@
-import { ProgressCreate, ProgressEntry, ProgressList, ProgressTrend, ProgressUpdate } from '@/types/progress';
-import { API_ENDPOINTS } from '@/config/constants';
+import { MultiMetricTrends, ProgressCreate, ProgressEntry, ProgressList, ProgressTrend, ProgressUpdate } from '@/types/progress';
+import { API_ENDPOINTS, MAX_PAGE_SIZE } from '@/config/constants';
 
 const API_URL = process.env.NEXT_PUBLIC_BACKEND_URL || 'http://localhost:8000';
 
@@ -30,7 +30,9 @@ export const createProgressEntry = async (progressData: ProgressCreate): Promise
 };
 
 /**
- * Get all progress entries for the current user
+ * Get all progress entries for the current user, newest first
+ * The list endpoint is paginated, so pages are followed via next_cursor until the last one;
+ * a `days` window comes back in a single response.
  */
 export const getProgressEntries = async (days?: number): Promise<ProgressList> => {
   const token = localStorage.getItem('token');
@@ -38,23 +40,32 @@ export const getProgressEntries = async (days?: number): Promise<ProgressList> =
     throw new Error('Authentication required');
   }
 
-  const url = days 
-    ? `${API_URL}${API_ENDPOINTS.PROGRESS}?days=${days}` 
-    : `${API_URL}${API_ENDPOINTS.PROGRESS}`;
+  const progress: ProgressEntry[] = [];
+  let cursor: string | null | undefined;
+  do {
+    const params = new URLSearchParams(days ? { days: String(days) } : { limit: String(MAX_PAGE_SIZE) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
 
-  const response = await fetch(url, {
-    method: 'GET',
-    headers: {
-      'Authorization': `Bearer ${token}`
+    const response = await fetch(`${API_URL}${API_ENDPOINTS.PROGRESS}?${params}`, {
+      method: 'GET',
+      headers: {
+        'Authorization': `Bearer ${token}`
+      }
+    });
+
+    if (!response.ok) {
+      const errorData = await response.json();
+      throw new Error(errorData.detail || 'Failed to fetch progress entries');
     }
-  });
 
-  if (!response.ok) {
-    const errorData = await response.json();
-    throw new Error(errorData.detail || 'Failed to fetch progress entries');
-  }
+    const page: ProgressList = await response.json();
+    progress.push(...page.progress);
+    cursor = page.next_cursor;
+  } while (cursor);
 
-  return await response.json();
+  return { progress, next_cursor: null };
 };
 
 /**
@@ -154,3 +165,28 @@ export const getMetricTrends = async (metric: string, days: number = 90): Promis
 
   return await response.json();
 };
+
+/**
+ * Get trends for several metrics in one request
+ */
+export const getTrends = async (metrics: string[], days: number = 90): Promise<MultiMetricTrends> => {
+  const token = localStorage.getItem('token');
+  if (!token) {
+    throw new Error('Authentication required');
+  }
+
+  const params = new URLSearchParams({ metrics: metrics.join(','), days: String(days) });
+  const response = await fetch(`${API_URL}${API_ENDPOINTS.PROGRESS}/trends?${params}`, {
+    method: 'GET',
+    headers: {
+      'Authorization': `Bearer ${token}`
+    }
+  });
+
+  if (!response.ok) {
+    const errorData = await response.json();
+    throw new Error(errorData.detail || 'Failed to fetch trends');
+  }
+
+  return await response.json();
+};
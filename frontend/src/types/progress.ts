@@ -29,6 +29,7 @@ export interface ProgressUpdate extends ProgressCreate {}
 
 export interface ProgressList {
   progress: ProgressEntry[];
+  next_cursor?: string | null;
 }
 
 export interface ProgressTrendData {
@@ -41,6 +42,12 @@ export interface ProgressTrend {
   data: ProgressTrendData[];
   change?: number;
   period_days: number;
+  resolution?: 'entry' | 'week';
+}
+
+export interface MultiMetricTrends {
+  trends: Record<string, ProgressTrend>;
+  period_days: number;
 }
 
 export type MeasurementType = 'weight' | 'body_fat' | 'energy_level' | 'mood' | 'sleep_quality' | string;
@@ -114,3 +121,14 @@ export interface AdaptivePlanResponse {
   message?: string;
   plan?: any;
 }
+
+export interface JobResponse {
+  job_id: string;
+  kind: string;
+  status: 'pending' | 'running' | 'succeeded' | 'failed';
+  created_at: string;
+  started_at?: string | null;
+  finished_at?: string | null;
+  result?: any;
+  error?: string | null;
+}